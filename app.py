@@ -5,13 +5,19 @@ A beautiful dashboard for running investigations and viewing results.
 """
 
 import asyncio
-import json
+import hashlib
+import os
+import pickle
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
 from pathlib import Path
 
+import jinja2
+import numpy as np
 import streamlit as st
-import plotly.express as px
+from dotenv import load_dotenv
 import plotly.graph_objects as go
 
 # Add src to path
@@ -22,6 +28,9 @@ from src.agents.orchestrator import ResearchOrchestrator
 from src.state import AgentState
 
 
+# Load .env so API keys can be checked straight from the environment
+load_dotenv()
+
 # Page configuration
 st.set_page_config(
     page_title="Research Agent",
@@ -31,76 +40,44 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: 700;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 0;
-    }
-    .sub-header {
-        color: #6b7280;
-        font-size: 1.1rem;
-        margin-top: 0;
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 1.5rem;
-        border-radius: 1rem;
-        color: white;
-    }
-    .risk-high { 
-        background-color: #fee2e2; 
-        border-left: 4px solid #ef4444;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-        color: #1f2937 !important;
-    }
-    .risk-high strong, .risk-high small { color: #1f2937 !important; }
-    .risk-medium { 
-        background-color: #fef3c7; 
-        border-left: 4px solid #f59e0b;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-        color: #1f2937 !important;
-    }
-    .risk-medium strong, .risk-medium small { color: #1f2937 !important; }
-    .risk-low { 
-        background-color: #d1fae5; 
-        border-left: 4px solid #10b981;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-        color: #1f2937 !important;
-    }
-    .risk-low strong, .risk-low small { color: #1f2937 !important; }
-    .finding-card {
-        background-color: #f3f4f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-        color: #1f2937 !important;
-    }
-    .finding-card strong { color: #374151 !important; }
-    .connection-card {
-        background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%);
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 0.5rem 0;
-        border-left: 4px solid #0ea5e9;
-        color: #1f2937 !important;
-    }
-    .connection-card strong { color: #1e40af !important; }
-    .stProgress > div > div > div > div {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-    }
-</style>
-""", unsafe_allow_html=True)
+STYLES_PATH = Path(__file__).parent / "static" / "styles.css"
+
+# Finished investigations, reused for the same target, context and
+# iterations until they are a day old; only the newest few are kept
+INVESTIGATION_CACHE_DIR = Path("output") / "cache" / "investigations"
+INVESTIGATION_CACHE_TTL = 24 * 60 * 60
+INVESTIGATION_CACHE_MAX_ENTRIES = 50
+
+# Result card templates (autoescaped, since card text comes from web pages and LLMs)
+FINDING_CARD = jinja2.Template(
+    '<div class="finding-card">'
+    '<strong>{{ category }}</strong> · {{ confidence }} confidence {{ verified }}<br>'
+    '{{ fact }}'
+    '</div>',
+    autoescape=True,
+)
+RISK_CARD = jinja2.Template(
+    '<div class="{{ risk_class }}">'
+    '<strong>{{ category }}</strong> · Severity: {{ severity }}/10<br>'
+    '{{ description }}<br>'
+    '<small>Evidence: {{ evidence }}</small>'
+    '</div>',
+    autoescape=True,
+)
+CONNECTION_CARD = jinja2.Template(
+    '<div class="connection-card">'
+    '{{ icon }} <strong>{{ entity_name }}</strong><br>'
+    '{{ relationship }} · {{ confidence }} confidence'
+    '{% if timeframe %} · {{ timeframe }}{% endif %}'
+    '</div>',
+    autoescape=True,
+)
+
+
+@st.cache_data
+def load_css() -> str:
+    """Read the dashboard stylesheet once per process."""
+    return STYLES_PATH.read_text()
 
 
 def init_session_state():
@@ -109,39 +86,159 @@ def init_session_state():
         st.session_state.investigation_results = None
     if "is_running" not in st.session_state:
         st.session_state.is_running = False
+    if "sorted_results" not in st.session_state:
+        st.session_state.sorted_results = None
+    if "last_investigation" not in st.session_state:
+        st.session_state.last_investigation = None
+    if "rerun_investigation" not in st.session_state:
+        st.session_state.rerun_investigation = False
     if "api_keys_configured" not in st.session_state:
-        st.session_state.api_keys_configured = False
+        st.session_state.api_keys_configured = check_api_keys()
+
+
+@st.cache_resource
+def get_settings() -> Settings:
+    """Get the settings shared by all reruns, parsing the environment once."""
+    return Settings()
 
 
 def check_api_keys() -> bool:
-    """Check if API keys are configured."""
-    try:
-        settings = Settings()
-        return all([
-            settings.groq_api_key and settings.groq_api_key != "your_groq_api_key_here",
-            settings.google_api_key and settings.google_api_key != "your_google_api_key_here",
-            settings.serper_api_key and settings.serper_api_key != "your_serper_api_key_here",
-        ])
-    except:
-        return False
+    """Check if API keys are configured, without validating the full Settings model."""
+    placeholders = {
+        "your_groq_api_key_here",
+        "your_google_api_key_here",
+        "your_serper_api_key_here",
+    }
+    values = [
+        os.environ.get(key, "")
+        for key in ("GROQ_API_KEY", "GOOGLE_API_KEY", "SERPER_API_KEY")
+    ]
+    return all(value and value not in placeholders for value in values)
 
 
-async def run_investigation(target: str, context: str, max_iterations: int) -> AgentState:
-    """Run the research agent investigation."""
-    settings = Settings()
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the background event loop shared by all reruns.
+    
+    Keeping one loop alive lets the orchestrator's HTTP clients reuse
+    their connection pools instead of being rebuilt per investigation.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+@st.cache_resource
+def get_orchestrator() -> ResearchOrchestrator:
+    """
+    Get the orchestrator shared by all reruns and sessions.
     
-    orchestrator = ResearchOrchestrator(
+    Per-investigation state (the audit logger) lives in the running
+    investigation's context, so sessions can investigate concurrently.
+    """
+    settings = get_settings()
+    
+    return ResearchOrchestrator(
         groq_api_key=settings.groq_api_key,
         google_api_key=settings.google_api_key,
         serper_api_key=settings.serper_api_key,
         output_dir=Path("output"),
+        groq_rpm=settings.groq_rpm,
     )
-    
-    return await orchestrator.investigate(
-        target_name=target,
-        context=context,
-        max_iterations=max_iterations,
+
+
+def stream_investigation(target: str, context: str, max_iterations: int, on_progress) -> AgentState:
+    """
+    Run the research agent investigation on the background loop.
+    
+    Each intermediate state is handed to ``on_progress`` from the main
+    script thread, so the page can update while the graph is still running.
+    """
+    updates: queue.Queue = queue.Queue()
+    # Looked up here: cached resources need the script thread's run context
+    orchestrator = get_orchestrator()
+    
+    async def produce() -> AgentState:
+        final_state = None
+        async for final_state in orchestrator.investigate_stream(
+            target_name=target,
+            context=context,
+            max_iterations=max_iterations,
+        ):
+            updates.put(final_state)
+        return final_state
+    
+    future = asyncio.run_coroutine_threadsafe(produce(), get_event_loop())
+    try:
+        while not future.done() or not updates.empty():
+            try:
+                on_progress(updates.get(timeout=0.1))
+            except queue.Empty:
+                continue
+    finally:
+        # A rerun or closed session stops this script; don't leave the
+        # investigation running on the background loop
+        if not future.done():
+            future.cancel()
+    
+    return future.result()
+
+
+def investigation_cache_path(target: str, context: str, max_iterations: int) -> Path:
+    """Path of the stored result for a target/context/iterations."""
+    key = hashlib.blake2b(
+        repr((target, context, max_iterations)).encode(),
+        digest_size=16,
+    ).hexdigest()
+    return INVESTIGATION_CACHE_DIR / f"{key}.pickle"
+
+
+def load_investigation(target: str, context: str, max_iterations: int) -> AgentState | None:
+    """Load a stored investigation result, if there is one that has not expired."""
+    path = investigation_cache_path(target, context, max_iterations)
+    try:
+        if time.time() - path.stat().st_mtime > INVESTIGATION_CACHE_TTL:
+            return None
+        with path.open("rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        # Missing, unreadable, or written by an incompatible version
+        return None
+
+
+def save_investigation(target: str, context: str, max_iterations: int, result: AgentState):
+    """Store an investigation result, dropping the oldest beyond the entry limit."""
+    path = investigation_cache_path(target, context, max_iterations)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Written aside and renamed, so a concurrent load never sees a partial file
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("wb") as f:
+        pickle.dump(result, f)
+    tmp_path.replace(path)
+    
+    stored = sorted(
+        INVESTIGATION_CACHE_DIR.glob("*.pickle"),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True,
     )
+    for old in stored[INVESTIGATION_CACHE_MAX_ENTRIES:]:
+        old.unlink(missing_ok=True)
+
+
+def render_progress(state: AgentState):
+    """Render live counters for a running investigation."""
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Findings", len(state.findings))
+    with col2:
+        st.metric("Risks", len(state.risk_indicators))
+    with col3:
+        st.metric("Connections", len(state.connections))
+    with col4:
+        st.metric("Iterations", state.iteration_count)
 
 
 def render_sidebar():
@@ -149,9 +246,8 @@ def render_sidebar():
     with st.sidebar:
         st.markdown("## ⚙️ Configuration")
         
-        # API Key Status
-        api_configured = check_api_keys()
-        if api_configured:
+        # API Key Status (checked once per session)
+        if st.session_state.api_keys_configured:
             st.success("✅ API Keys Configured")
         else:
             st.error("❌ API Keys Missing")
@@ -164,6 +260,19 @@ def render_sidebar():
             ```
             """)
         
+        if st.button("🔄 Reload Config", use_container_width=True):
+            if st.session_state.api_keys_configured:
+                # Release the old orchestrator's clients once investigations
+                # other sessions are running on it have finished
+                asyncio.run_coroutine_threadsafe(
+                    get_orchestrator().close_when_idle(), get_event_loop()
+                )
+            load_dotenv(override=True)
+            get_settings.clear()
+            get_orchestrator.clear()
+            st.session_state.api_keys_configured = check_api_keys()
+            st.rerun()
+        
         st.divider()
         
         # Investigation settings
@@ -280,7 +389,7 @@ def render_connections_network(state: AgentState):
     nodes = [{"id": state.target_name, "group": "target"}]
     edges = []
     
-    for conn in state.connections[:15]:  # Limit to 15 for visualization
+    for conn in state.connections:
         nodes.append({
             "id": conn.entity_name,
             "group": conn.entity_type,
@@ -291,48 +400,45 @@ def render_connections_network(state: AgentState):
             "relationship": conn.relationship,
         })
     
-    # Create network chart using scatter
-    import math
-    
-    # Position nodes in a circle
-    n = len(nodes)
-    positions = {}
-    for i, node in enumerate(nodes):
-        if node["id"] == state.target_name:
-            positions[node["id"]] = (0, 0)
-        else:
-            angle = 2 * math.pi * (i - 1) / (n - 1)
-            positions[node["id"]] = (math.cos(angle) * 2, math.sin(angle) * 2)
+    # Position non-target nodes evenly on a circle around the target
+    names = [node["id"] for node in nodes[1:]]
+    angles = np.linspace(0, 2 * np.pi, len(names), endpoint=False)
+    xs, ys = np.cos(angles) * 2, np.sin(angles) * 2
+    positions = dict(zip(names, zip(xs.tolist(), ys.tolist())))
+    positions[state.target_name] = (0, 0)
     
-    # Create figure
+    # Create figure (WebGL traces scale to the full connection set)
     fig = go.Figure()
     
-    # Add edges
+    # Add all edges as one trace, separating segments with None
+    edge_x, edge_y = [], []
     for edge in edges:
         x0, y0 = positions[edge["source"]]
         x1, y1 = positions[edge["target"]]
-        fig.add_trace(go.Scatter(
-            x=[x0, x1], y=[y0, y1],
-            mode="lines",
-            line=dict(width=1, color="#94a3b8"),
-            hoverinfo="none",
-            showlegend=False,
-        ))
-    
-    # Add nodes
+        edge_x.extend([x0, x1, None])
+        edge_y.extend([y0, y1, None])
+    
+    fig.add_trace(go.Scattergl(
+        x=edge_x, y=edge_y,
+        mode="lines",
+        line=dict(width=1, color="#94a3b8"),
+        hoverinfo="none",
+        showlegend=False,
+    ))
+    
+    # Add all nodes as one trace
     colors = {"target": "#667eea", "person": "#10b981", "organization": "#f59e0b", "event": "#ef4444"}
-    for node in nodes:
-        x, y = positions[node["id"]]
-        fig.add_trace(go.Scatter(
-            x=[x], y=[y],
-            mode="markers+text",
-            marker=dict(size=20, color=colors.get(node["group"], "#94a3b8")),
-            text=[node["id"][:20]],
-            textposition="top center",
-            hoverinfo="text",
-            hovertext=node["id"],
-            showlegend=False,
-        ))
+    fig.add_trace(go.Scattergl(
+        x=[positions[node["id"]][0] for node in nodes],
+        y=[positions[node["id"]][1] for node in nodes],
+        mode="markers+text",
+        marker=dict(size=20, color=[colors.get(node["group"], "#94a3b8") for node in nodes]),
+        text=[node["id"][:20] for node in nodes],
+        textposition="top center",
+        hoverinfo="text",
+        hovertext=[node["id"] for node in nodes],
+        showlegend=False,
+    ))
     
     fig.update_layout(
         title="Connection Network",
@@ -346,6 +452,19 @@ def render_connections_network(state: AgentState):
     st.plotly_chart(fig, use_container_width=True)
 
 
+def get_sorted_results(state: AgentState) -> tuple[list, list]:
+    """Get findings by confidence and risks by severity, sorted once per result set."""
+    cached = st.session_state.sorted_results
+    if cached is None or cached[0] != id(state):
+        cached = (
+            id(state),
+            sorted(state.findings, key=lambda f: f.confidence, reverse=True),
+            sorted(state.risk_indicators, key=lambda r: r.severity, reverse=True),
+        )
+        st.session_state.sorted_results = cached
+    return cached[1], cached[2]
+
+
 def render_results(state: AgentState):
     """Render the investigation results."""
     # Summary metrics
@@ -381,47 +500,50 @@ def render_results(state: AgentState):
     st.divider()
     
     # Detailed findings in tabs
+    sorted_findings, sorted_risks = get_sorted_results(state)
     tab1, tab2, tab3, tab4 = st.tabs(["📋 Findings", "⚠️ Risks", "🔗 Connections", "📄 Full Report"])
     
     with tab1:
         if state.findings:
-            for finding in sorted(state.findings, key=lambda f: f.confidence, reverse=True):
-                conf_pct = f"{finding.confidence:.0%}"
-                verified = "✓" if finding.verified else ""
-                st.markdown(f"""
-                <div class="finding-card">
-                    <strong>{finding.category.title()}</strong> · {conf_pct} confidence {verified}<br>
-                    {finding.fact}
-                </div>
-                """, unsafe_allow_html=True)
+            html_parts = []
+            for finding in sorted_findings:
+                html_parts.append(FINDING_CARD.render(
+                    category=finding.category.title(),
+                    confidence=f"{finding.confidence:.0%}",
+                    verified="✓" if finding.verified else "",
+                    fact=finding.fact,
+                ))
+            st.markdown("\n".join(html_parts), unsafe_allow_html=True)
         else:
             st.info("No findings extracted")
     
     with tab2:
         if state.risk_indicators:
-            for risk in sorted(state.risk_indicators, key=lambda r: r.severity, reverse=True):
-                risk_class = "risk-high" if risk.severity >= 7 else "risk-medium" if risk.severity >= 4 else "risk-low"
-                st.markdown(f"""
-                <div class="{risk_class}">
-                    <strong>{risk.category.title()}</strong> · Severity: {risk.severity}/10<br>
-                    {risk.description}<br>
-                    <small>Evidence: {'; '.join(risk.evidence[:2])}</small>
-                </div>
-                """, unsafe_allow_html=True)
+            html_parts = []
+            for risk in sorted_risks:
+                html_parts.append(RISK_CARD.render(
+                    risk_class="risk-high" if risk.severity >= 7 else "risk-medium" if risk.severity >= 4 else "risk-low",
+                    category=risk.category.title(),
+                    severity=risk.severity,
+                    description=risk.description,
+                    evidence="; ".join(risk.evidence[:2]),
+                ))
+            st.markdown("\n".join(html_parts), unsafe_allow_html=True)
         else:
             st.success("No significant risks identified")
     
     with tab3:
         if state.connections:
+            html_parts = []
             for conn in state.connections:
-                icon = "👤" if conn.entity_type == "person" else "🏢" if conn.entity_type == "organization" else "📅"
-                st.markdown(f"""
-                <div class="connection-card">
-                    {icon} <strong>{conn.entity_name}</strong><br>
-                    {conn.relationship} · {conn.confidence:.0%} confidence
-                    {f" · {conn.timeframe}" if conn.timeframe else ""}
-                </div>
-                """, unsafe_allow_html=True)
+                html_parts.append(CONNECTION_CARD.render(
+                    icon="👤" if conn.entity_type == "person" else "🏢" if conn.entity_type == "organization" else "📅",
+                    entity_name=conn.entity_name,
+                    relationship=conn.relationship,
+                    confidence=f"{conn.confidence:.0%}",
+                    timeframe=conn.timeframe,
+                ))
+            st.markdown("\n".join(html_parts), unsafe_allow_html=True)
         else:
             st.info("No connections mapped")
     
@@ -442,6 +564,9 @@ def main():
     """Main application entry point."""
     init_session_state()
     
+    # Custom CSS
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+    
     # Header
     st.markdown('<h1 class="main-header">🔍 Autonomous Research Agent</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">AI-powered investigation for due diligence and risk assessment</p>', unsafe_allow_html=True)
@@ -454,14 +579,25 @@ def main():
         # Show results
         render_results(st.session_state.investigation_results)
         
-        if st.button("🔄 New Investigation", type="secondary"):
-            st.session_state.investigation_results = None
-            st.rerun()
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("🔄 New Investigation", type="secondary", use_container_width=True):
+                st.session_state.investigation_results = None
+                st.session_state.sorted_results = None
+                st.rerun()
+        with col2:
+            # Runs the same investigation again, ignoring the stored result
+            if st.button("🔁 Re-run", type="secondary", use_container_width=True):
+                st.session_state.investigation_results = None
+                st.session_state.sorted_results = None
+                st.session_state.rerun_investigation = True
+                st.rerun()
     else:
         # Show investigation form
         st.markdown("### 🚀 Start Investigation")
         
-        if not check_api_keys():
+        if not st.session_state.api_keys_configured:
             st.warning("⚠️ Please configure API keys in `.env` file before running investigations.")
             st.markdown("""
             **Required API Keys:**
@@ -480,26 +616,40 @@ def main():
             run_button = st.button(
                 "🔍 Run Investigation",
                 type="primary",
-                disabled=not target or not check_api_keys() or st.session_state.is_running,
+                disabled=not target or not st.session_state.api_keys_configured or st.session_state.is_running,
                 use_container_width=True,
             )
         
-        if run_button and target:
+        fresh = st.session_state.rerun_investigation and st.session_state.last_investigation
+        st.session_state.rerun_investigation = False
+        if fresh:
+            target, context, iterations = st.session_state.last_investigation
+        
+        if (run_button or fresh) and target:
             st.session_state.is_running = True
+            st.session_state.last_investigation = (target, context, iterations)
             
             with st.status("Running investigation...", expanded=True) as status:
                 st.write("🔍 Initializing search...")
+                progress = st.empty()
+                
+                def show_progress(state: AgentState):
+                    with progress.container():
+                        render_progress(state)
                 
                 try:
-                    # Run the async investigation
-                    results = asyncio.run(run_investigation(target, context, iterations))
+                    # Reuse results stored on disk unless re-running, otherwise stream a fresh run
+                    results = None if fresh else load_investigation(target, context, iterations)
+                    if results is None:
+                        results = stream_investigation(target, context, iterations, show_progress)
+                        save_investigation(target, context, iterations, results)
                     
                     st.session_state.investigation_results = results
                     st.session_state.is_running = False
                     
                     status.update(label="✅ Investigation complete!", state="complete")
                     st.rerun()
-                    
+                
                 except Exception as e:
                     st.session_state.is_running = False
                     status.update(label="❌ Investigation failed", state="error")
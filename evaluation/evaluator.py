@@ -7,13 +7,21 @@ Evaluates the research agent against ground truth personas.
 import argparse
 import asyncio
 import json
+import os
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+import ahocorasick
+import numpy as np
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -34,15 +42,178 @@ class EvaluationResult:
     details: dict[str, Any]
 
 
-def load_persona(persona_path: Path) -> dict[str, Any]:
-    """Load a persona definition file."""
-    with open(persona_path) as f:
+@dataclass(frozen=True)
+class PreparedExpected:
+    """An expected persona item with its match text precomputed."""
+    fact: str  # Text to match: finding fact, risk description or entity name
+    fact_lower: str
+    key_terms: tuple[str, ...]
+    required: bool = False
+    category: str = ""  # Lowercased risk category
+    data: dict[str, Any] = field(default_factory=dict)  # Original JSON entry
+
+
+@dataclass
+class PreparedPersona:
+    """A persona definition prepared for coverage calculation."""
+    name: str
+    description: str
+    context: str
+    findings: list[PreparedExpected]
+    risks: list[PreparedExpected]
+    connections: list[PreparedExpected]
+    minimum_scores: dict[str, float]
+
+
+def _key_terms(text: str) -> tuple[str, ...]:
+    """
+    Lowercase key terms (words longer than 3 chars) used for fuzzy matching.
+    
+    Terms are interned so repeats across a persona share one string object
+    and hash lookups while building the term index compare by identity.
+    """
+    return tuple(sys.intern(t) for t in text.lower().split() if len(t) > 3)
+
+
+def _prepare(text: str, data: dict[str, Any], **kwargs) -> PreparedExpected:
+    """Lowercase and tokenize one expected item."""
+    return PreparedExpected(
+        fact=text,
+        fact_lower=text.lower(),
+        key_terms=_key_terms(text),
+        data=data,
+        **kwargs,
+    )
+
+
+def _read_json(path: Path) -> Any:
+    """Parse a JSON file, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path) as f:
         return json.load(f)
 
 
+def _write_json(path: Path, payload: Any) -> None:
+    """Write indented JSON, using orjson when available."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_persona(persona_path: Path) -> PreparedPersona:
+    """Load a persona definition file and precompute its match structures."""
+    persona = _read_json(persona_path)
+    
+    return PreparedPersona(
+        name=persona["name"],
+        description=persona["description"],
+        context=persona.get("context", ""),
+        findings=[
+            _prepare(expected["fact"], expected, required=expected.get("required", False))
+            for facts in persona["expected_findings"].values()
+            for expected in facts
+        ],
+        risks=[
+            _prepare(expected["description"], expected, category=expected["category"].lower())
+            for expected in persona["expected_risks"]
+        ],
+        connections=[
+            _prepare(expected["entity"], expected)
+            for expected in persona["expected_connections"]
+        ],
+        minimum_scores=persona.get("minimum_scores", {}),
+    )
+
+
+def _build_term_index(
+    term_lists: list[tuple[str, ...]],
+) -> tuple[ahocorasick.Automaton | None, np.ndarray]:
+    """
+    Compile all expected terms into one automaton plus a weight matrix.
+    
+    Returns:
+        Tuple of (automaton mapping each term to its column id, or None if
+        there are no terms; (num_expected x num_terms) matrix counting how
+        often each term occurs in each expected item)
+    """
+    term_ids: dict[str, int] = {}
+    for terms in term_lists:
+        for term in terms:
+            term_ids.setdefault(term, len(term_ids))
+    
+    weights = np.zeros((len(term_lists), len(term_ids)), dtype=np.int32)
+    for idx, terms in enumerate(term_lists):
+        for term in terms:
+            weights[idx, term_ids[term]] += 1
+    
+    if not term_ids:
+        return None, weights
+    
+    automaton = ahocorasick.Automaton()
+    for term, term_id in term_ids.items():
+        automaton.add_word(term, term_id)
+    automaton.make_automaton()
+    return automaton, weights
+
+
+def _match_expected(
+    automaton: ahocorasick.Automaton | None,
+    weights: np.ndarray,
+    texts: list[str],
+    threshold: float,
+    allowed: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Flag expected items whose key-term hits in some text reach the threshold.
+    
+    Texts are scanned in order and scanning stops as soon as every expected
+    item has been found.
+    
+    Args:
+        automaton: Term automaton from _build_term_index
+        weights: (num_expected x num_terms) term counts from _build_term_index
+        texts: Lowercased actual texts
+        threshold: Fraction of an item's key terms that must occur
+        allowed: Optional (num_texts x num_expected) mask of eligible pairs
+    
+    Returns:
+        Boolean vector with one entry per expected item
+    """
+    needed = weights.sum(axis=1) * threshold
+    found = np.zeros(weights.shape[0], dtype=bool)
+    presence = np.zeros(weights.shape[1], dtype=np.int32)
+    
+    for row, text in enumerate(texts):
+        if found.all():
+            break
+        
+        presence[:] = 0
+        if automaton is not None:
+            for _, term_id in automaton.iter(text):
+                presence[term_id] = 1
+        
+        hit = weights @ presence >= needed
+        if allowed is not None:
+            hit &= allowed[row]
+        found |= hit
+    
+    return found
+
+
+def _pairwise(predicate, rows: list[str], cols: list[str]) -> np.ndarray:
+    """Boolean (len(rows) x len(cols)) matrix of predicate(row, col)."""
+    return np.array(
+        [[predicate(row, col) for col in cols] for row in rows],
+        dtype=bool,
+    ).reshape(len(rows), len(cols))
+
+
 def calculate_finding_coverage(
     actual_findings: list,
-    expected_findings: dict[str, list],
+    expected_findings: list[PreparedExpected],
 ) -> tuple[float, dict]:
     """
     Calculate what percentage of expected findings were discovered.
@@ -50,39 +221,27 @@ def calculate_finding_coverage(
     Returns:
         Tuple of (coverage_score, details)
     """
+    automaton, weights = _build_term_index([expected.key_terms for expected in expected_findings])
+    actual_texts = [
+        actual.fact.lower() if hasattr(actual, 'fact') else str(actual).lower()
+        for actual in actual_findings
+    ]
+    
+    # Fuzzy matching - 50% of key terms match
+    is_found = _match_expected(automaton, weights, actual_texts, 0.5)
+    
     found_count = 0
-    required_count = 0
-    total_expected = 0
     matched = []
     missing = []
     
-    for category, facts in expected_findings.items():
-        for expected in facts:
-            total_expected += 1
-            if expected.get("required"):
-                required_count += 1
-            
-            # Check if any actual finding matches
-            fact_text = expected["fact"].lower()
-            is_found = False
-            
-            for actual in actual_findings:
-                actual_text = actual.fact.lower() if hasattr(actual, 'fact') else str(actual).lower()
-                
-                # Fuzzy matching - check if key terms are present
-                key_terms = [t for t in fact_text.split() if len(t) > 3]
-                matches = sum(1 for term in key_terms if term in actual_text)
-                
-                if matches >= len(key_terms) * 0.5:  # 50% of key terms match
-                    is_found = True
-                    break
-            
-            if is_found:
-                found_count += 1
-                matched.append(expected["fact"])
-            else:
-                missing.append({"fact": expected["fact"], "required": expected.get("required", False)})
+    for expected, found in zip(expected_findings, is_found):
+        if found:
+            found_count += 1
+            matched.append(expected.fact)
+        else:
+            missing.append({"fact": expected.fact, "required": expected.required})
     
+    total_expected = len(expected_findings)
     coverage = found_count / total_expected if total_expected > 0 else 0
     
     return coverage, {
@@ -95,36 +254,34 @@ def calculate_finding_coverage(
 
 def calculate_risk_coverage(
     actual_risks: list,
-    expected_risks: list,
+    expected_risks: list[PreparedExpected],
 ) -> tuple[float, dict]:
     """Calculate what percentage of expected risks were identified."""
+    automaton, weights = _build_term_index([expected.key_terms for expected in expected_risks])
+    actual_descs = [
+        actual.description.lower() if hasattr(actual, 'description') else str(actual).lower()
+        for actual in actual_risks
+    ]
+    actual_cats = [
+        actual.category.lower() if hasattr(actual, 'category') else ""
+        for actual in actual_risks
+    ]
+    expected_cats = [expected.category for expected in expected_risks]
+    
+    # Check category match and description similarity
+    category_match = _pairwise(lambda actual, expected: expected in actual, actual_cats, expected_cats)
+    is_found = _match_expected(automaton, weights, actual_descs, 0.4, allowed=category_match)
+    
     found_count = 0
     matched = []
     missing = []
     
-    for expected in expected_risks:
-        expected_desc = expected["description"].lower()
-        expected_cat = expected["category"].lower()
-        
-        is_found = False
-        for actual in actual_risks:
-            actual_desc = actual.description.lower() if hasattr(actual, 'description') else str(actual).lower()
-            actual_cat = actual.category.lower() if hasattr(actual, 'category') else ""
-            
-            # Check category match and description similarity
-            if expected_cat in actual_cat:
-                key_terms = [t for t in expected_desc.split() if len(t) > 3]
-                matches = sum(1 for term in key_terms if term in actual_desc)
-                
-                if matches >= len(key_terms) * 0.4:
-                    is_found = True
-                    break
-        
-        if is_found:
+    for expected, found in zip(expected_risks, is_found):
+        if found:
             found_count += 1
-            matched.append(expected["description"])
+            matched.append(expected.fact)
         else:
-            missing.append(expected)
+            missing.append(expected.data)
     
     coverage = found_count / len(expected_risks) if expected_risks else 0
     
@@ -138,29 +295,31 @@ def calculate_risk_coverage(
 
 def calculate_connection_coverage(
     actual_connections: list,
-    expected_connections: list,
+    expected_connections: list[PreparedExpected],
 ) -> tuple[float, dict]:
     """Calculate what percentage of expected connections were mapped."""
+    entity_names = [expected.fact_lower for expected in expected_connections]
+    automaton, weights = _build_term_index([(name,) for name in entity_names])
+    actual_names = [
+        actual.entity_name.lower() if hasattr(actual, 'entity_name') else str(actual).lower()
+        for actual in actual_connections
+    ]
+    
+    # Expected name inside the actual name, or the other way round
+    within_expected = _pairwise(lambda actual, expected: actual in expected, actual_names, entity_names)
+    is_found = within_expected.any(axis=0)
+    is_found |= _match_expected(automaton, weights, actual_names, 1.0)
+    
     found_count = 0
     matched = []
     missing = []
     
-    for expected in expected_connections:
-        entity_name = expected["entity"].lower()
-        
-        is_found = False
-        for actual in actual_connections:
-            actual_name = actual.entity_name.lower() if hasattr(actual, 'entity_name') else str(actual).lower()
-            
-            if entity_name in actual_name or actual_name in entity_name:
-                is_found = True
-                break
-        
-        if is_found:
+    for expected, found in zip(expected_connections, is_found):
+        if found:
             found_count += 1
-            matched.append(expected["entity"])
+            matched.append(expected.fact)
         else:
-            missing.append(expected)
+            missing.append(expected.data)
     
     coverage = found_count / len(expected_connections) if expected_connections else 0
     
@@ -182,7 +341,7 @@ async def evaluate_persona(
     Args:
         persona_path: Path to persona JSON file
         orchestrator: Research orchestrator instance
-        
+    
     Returns:
         EvaluationResult with scores and details
     """
@@ -190,38 +349,38 @@ async def evaluate_persona(
     persona = load_persona(persona_path)
     
     print(f"\n{'='*60}")
-    print(f"Evaluating: {persona['name']}")
-    print(f"Description: {persona['description']}")
+    print(f"Evaluating: {persona.name}")
+    print(f"Description: {persona.description}")
     print(f"{'='*60}\n")
     
     # Run investigation
     state = await orchestrator.investigate(
-        target_name=persona["name"],
-        context=persona.get("context", ""),
+        target_name=persona.name,
+        context=persona.context,
         max_iterations=8,  # Fewer iterations for evaluation
     )
     
     # Calculate coverage scores
     finding_cov, finding_details = calculate_finding_coverage(
         state.findings,
-        persona["expected_findings"],
+        persona.findings,
     )
     
     risk_cov, risk_details = calculate_risk_coverage(
         state.risk_indicators,
-        persona["expected_risks"],
+        persona.risks,
     )
     
     conn_cov, conn_details = calculate_connection_coverage(
         state.connections,
-        persona["expected_connections"],
+        persona.connections,
     )
     
     # Overall score (weighted average)
     overall = (finding_cov * 0.5) + (risk_cov * 0.3) + (conn_cov * 0.2)
     
     # Check if passed
-    min_scores = persona.get("minimum_scores", {})
+    min_scores = persona.minimum_scores
     passed = (
         finding_cov >= min_scores.get("finding_coverage", 0.8) and
         risk_cov >= min_scores.get("risk_coverage", 0.75) and
@@ -229,7 +388,7 @@ async def evaluate_persona(
     )
     
     return EvaluationResult(
-        persona_name=persona["name"],
+        persona_name=persona.name,
         finding_coverage=finding_cov,
         risk_coverage=risk_cov,
         connection_coverage=conn_cov,
@@ -305,16 +464,7 @@ async def main():
     # Get settings
     settings = get_settings()
     
-    # Create orchestrator
-    orchestrator = ResearchOrchestrator(
-        groq_api_key=settings.groq_api_key,
-        google_api_key=settings.google_api_key,
-        serper_api_key=settings.serper_api_key,
-        output_dir=Path("output"),
-    )
-    
     personas_dir = Path(__file__).parent / "personas"
-    results = []
     
     if args.all:
         persona_files = sorted(personas_dir.glob("persona_*.json"))
@@ -324,10 +474,39 @@ async def main():
     for persona_file in persona_files:
         if not persona_file.exists():
             print(f"❌ Persona file not found: {persona_file}")
-            continue
-        
-        result = await evaluate_persona(persona_file, orchestrator)
-        results.append(result)
+    persona_files = [f for f in persona_files if f.exists()]
+    
+    # One orchestrator for every evaluation, so all investigations share a
+    # single ModelManager and with it one Groq request quota
+    orchestrator = ResearchOrchestrator(
+        groq_api_key=settings.groq_api_key,
+        google_api_key=settings.google_api_key,
+        serper_api_key=settings.serper_api_key,
+        output_dir=Path("output"),
+        groq_rpm=settings.groq_rpm,
+    )
+    
+    # Bound concurrent investigations to respect provider rate limits
+    semaphore = asyncio.Semaphore(int(os.getenv("EVAL_CONCURRENCY", "3")))
+    
+    async def run_evaluation(persona_file: Path) -> EvaluationResult:
+        async with semaphore:
+            return await evaluate_persona(persona_file, orchestrator)
+    
+    try:
+        outcomes = await asyncio.gather(
+            *(run_evaluation(f) for f in persona_files),
+            return_exceptions=True,
+        )
+    finally:
+        await orchestrator.close()
+    
+    results = []
+    for persona_file, outcome in zip(persona_files, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"❌ Evaluation failed for {persona_file.stem}: {outcome}")
+        else:
+            results.append(outcome)
     
     # Print report
     print_evaluation_report(results)
@@ -336,22 +515,20 @@ async def main():
     output_file = Path("output") / "evaluation_results.json"
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(output_file, "w") as f:
-        json.dump(
-            [
-                {
-                    "persona": r.persona_name,
-                    "finding_coverage": r.finding_coverage,
-                    "risk_coverage": r.risk_coverage,
-                    "connection_coverage": r.connection_coverage,
-                    "overall_score": r.overall_score,
-                    "passed": r.passed,
-                }
-                for r in results
-            ],
-            f,
-            indent=2,
-        )
+    _write_json(
+        output_file,
+        [
+            {
+                "persona": r.persona_name,
+                "finding_coverage": r.finding_coverage,
+                "risk_coverage": r.risk_coverage,
+                "connection_coverage": r.connection_coverage,
+                "overall_score": r.overall_score,
+                "passed": r.passed,
+            }
+            for r in results
+        ],
+    )
     
     print(f"\n📁 Results saved to: {output_file}")
 
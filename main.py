@@ -12,9 +12,6 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-from src.config import get_settings
-from src.agents.orchestrator import ResearchOrchestrator
-
 
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
@@ -72,6 +69,10 @@ async def main():
     # Parse arguments
     args = parse_args()
     
+    # Deferred so --help and argument errors don't load the agents and model clients
+    from src.config import get_settings
+    from src.agents.orchestrator import ResearchOrchestrator
+    
     # Get settings
     try:
         settings = get_settings()
@@ -105,6 +106,7 @@ async def main():
         google_api_key=settings.google_api_key,
         serper_api_key=settings.serper_api_key,
         output_dir=args.output,
+        groq_rpm=settings.groq_rpm,
     )
     
     try:
@@ -149,7 +151,14 @@ async def main():
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        await orchestrator.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop  # Optional, faster event loop where available
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -4,25 +4,29 @@ Connection Mapper Agent
 Traces relationships between entities, organizations, and events.
 """
 
-import json
+import hashlib
+import heapq
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import islice
 from typing import Any
 
-from ..models.model_manager import ModelManager, TaskType
+from ..models.model_manager import STREAM_ERRORS, ModelManager, TaskType
 from ..state import AgentState, Connection
 from ..utils.confidence import ConfidenceScorer
 
 
-CONNECTION_MAPPING_PROMPT = """You are an expert at mapping relationships and connections between entities.
+# Finding categories that inform connection mapping
+CONNECTION_CATEGORIES = frozenset({"associations", "professional", "financial"})
 
-TARGET: {target_name}
+# Completed mappings remembered for unchanged inputs
+MAPPED_PROMPTS = 32
 
-KNOWN FACTS ABOUT TARGET:
-{findings}
-
-SEARCH RESULTS FOR CONTEXT:
-{search_results}
+# Static mapping instructions, sent as the system message so the prompt
+# prefix is identical across calls and can be reused by provider prompt caching
+CONNECTION_MAPPING_SYSTEM = """You are an expert at mapping relationships and connections between entities.
 
-Map all connections between {target_name} and other entities. For each connection, identify:
+Map all connections between the target and other entities, using the known facts and search results you are given. For each connection, identify:
 
 1. ENTITY TYPE:
    - person: Individuals (colleagues, family, associates)
@@ -38,14 +42,14 @@ Map all connections between {target_name} and other entities. For each connectio
 
 Respond with a JSON array of connections:
 [
-  {{
+  {
     "entity_name": "Name of connected entity",
     "entity_type": "person|organization|event",
     "relationship": "specific relationship type",
     "timeframe": "2015-2020 (if known, else null)",
     "source_urls": ["url1"],
     "notes": "Additional context about this connection"
-  }}
+  }
 ]
 
 Include both obvious and less obvious connections. Look for:
@@ -58,6 +62,26 @@ Include both obvious and less obvious connections. Look for:
 """
 
 
+def connection_mapping_prompt(target_name: str, findings: str, search_results: str) -> str:
+    """Render the per-call mapping input (an f-string, compiled once at import)."""
+    return f"""TARGET: {target_name}
+
+KNOWN FACTS ABOUT TARGET:
+{findings}
+
+SEARCH RESULTS FOR CONTEXT:
+{search_results}
+
+Map all connections between {target_name} and other entities.
+"""
+
+
+@lru_cache(maxsize=256)
+def format_search_result(url: str, title: str, snippet: str) -> str:
+    """Format a search result for the mapping prompt, once per distinct result."""
+    return f"[{url}]\n{title}: {snippet}"
+
+
 class ConnectionMapperAgent:
     """
     Maps relationships between entities, organizations, and events.
@@ -87,26 +111,26 @@ class ConnectionMapperAgent:
     def __init__(self, model_manager: ModelManager):
         self.model_manager = model_manager
         self.confidence_scorer = ConfidenceScorer()
+        
+        # Connections of recently completed mappings, by prompt digest. Keyed
+        # on the prompt, so concurrent investigations keep separate entries
+        self._mapped: OrderedDict[bytes, list[Connection]] = OrderedDict()
     
     def _format_findings(self, state: AgentState) -> str:
         """Format findings relevant to connections."""
-        findings_text = []
-        
         # Focus on association-relevant findings
-        for finding in state.findings:
-            if finding.category in ["associations", "professional", "financial"]:
-                findings_text.append(
-                    f"[{finding.category.upper()}] {finding.fact}"
-                )
-        
-        return "\n".join(findings_text) if findings_text else "No relevant findings."
+        return "\n".join(
+            f"[{finding.category.upper()}] {finding.fact}"
+            for finding in state.findings
+            if finding.category in CONNECTION_CATEGORIES
+        ) or "No relevant findings."
     
     def _format_search_results(self, state: AgentState) -> str:
         """Format search results for connection mapping."""
-        results = []
-        for result in state.search_results[-15:]:
-            results.append(f"[{result.url}]\n{result.title}: {result.snippet}")
-        return "\n---\n".join(results) if results else "No results."
+        return "\n---\n".join(
+            format_search_result(result.url, result.title, result.snippet)
+            for result in state.get_recent_search_results(15)
+        ) or "No results."
     
     async def map_connections(self, state: AgentState) -> list[Connection]:
         """
@@ -114,49 +138,62 @@ class ConnectionMapperAgent:
         
         Args:
             state: Current agent state
-            
+        
         Returns:
             List of Connection objects
         """
         if not state.findings and not state.search_results:
             return []
         
-        prompt = CONNECTION_MAPPING_PROMPT.format(
+        prompt = connection_mapping_prompt(
             target_name=state.target_name,
             findings=self._format_findings(state),
             search_results=self._format_search_results(state),
         )
         
-        response = await self.model_manager.generate_structured(
-            prompt=prompt,
-            schema=self.CONNECTION_SCHEMA,
-            task_type=TaskType.FAST_EXTRACTION,
-        )
+        # Nothing to map if the prompt is the same as a recent mapping's
+        prompt_digest = hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+        mapped = self._mapped.get(prompt_digest)
+        if mapped is not None:
+            self._mapped.move_to_end(prompt_digest)
+            return list(mapped)
         
         connections = []
         
-        if response.success:
-            try:
-                data = json.loads(response.content)
+        # Score each connection as soon as it has streamed in
+        try:
+            async for item in self.model_manager.stream_structured(
+                prompt=prompt,
+                schema=self.CONNECTION_SCHEMA,
+                task_type=TaskType.FAST_EXTRACTION,
+                system_prompt=CONNECTION_MAPPING_SYSTEM,
+                cache_namespace="connection_mapping",
+            ):
+                if not isinstance(item, dict):
+                    continue
                 
-                for item in data:
-                    source_urls = item.get("source_urls", [])
-                    confidence = self.confidence_scorer.calculate_confidence(source_urls)
-                    
-                    connection = Connection(
-                        entity_name=item.get("entity_name", ""),
-                        entity_type=item.get("entity_type", "unknown"),
-                        relationship=item.get("relationship", "associated"),
-                        timeframe=item.get("timeframe"),
-                        source_urls=source_urls,
-                        confidence=confidence,
-                    )
-                    
-                    if connection.entity_name:
-                        connections.append(connection)
-                        
-            except json.JSONDecodeError:
-                pass
+                source_urls = item.get("source_urls", [])
+                confidence = self.confidence_scorer.calculate_confidence(source_urls)
+                
+                connection = Connection(
+                    entity_name=item.get("entity_name", ""),
+                    entity_type=item.get("entity_type", "unknown"),
+                    relationship=item.get("relationship", "associated"),
+                    timeframe=item.get("timeframe"),
+                    source_urls=source_urls,
+                    confidence=confidence,
+                )
+                
+                if connection.entity_name:
+                    connections.append(connection)
+            
+            self._mapped[prompt_digest] = list(connections)
+            if len(self._mapped) > MAPPED_PROMPTS:
+                self._mapped.popitem(last=False)
+        
+        except STREAM_ERRORS as e:
+            # Keep the connections that streamed before the failure
+            state.errors.append(f"Connection mapping failed: {e}")
         
         return connections
     
@@ -171,32 +208,34 @@ class ConnectionMapperAgent:
         Args:
             state: Current agent state
             max_queries: Maximum number of queries to generate
-            
+        
         Returns:
             List of search queries
         """
-        queries = []
-        
-        # Generate queries for high-confidence connections we want to learn more about
-        for connection in state.connections:
-            if connection.confidence >= 0.5 and len(queries) < max_queries:
-                # Query about the connection relationship
-                if connection.entity_type == "organization":
-                    queries.append(
-                        f"{state.target_name} {connection.entity_name} role responsibilities"
-                    )
-                elif connection.entity_type == "person":
-                    queries.append(
-                        f"{state.target_name} {connection.entity_name} relationship business"
-                    )
+        # Highest-confidence connections we want to learn more about
+        top = heapq.nlargest(
+            max_queries,
+            (
+                c for c in state.connections
+                if c.confidence >= 0.5 and c.entity_type in ("organization", "person")
+            ),
+            key=lambda c: c.confidence,
+        )
+        
+        # Query about the connection relationship
+        queries = [
+            f"{state.target_name} {connection.entity_name} role responsibilities"
+            if connection.entity_type == "organization"
+            else f"{state.target_name} {connection.entity_name} relationship business"
+            for connection in top
+        ]
         
         # Also look for connections between entities
-        if len(state.connections) >= 2:
-            orgs = [c for c in state.connections if c.entity_type == "organization"][:2]
-            if len(orgs) >= 2:
-                queries.append(
-                    f"{orgs[0].entity_name} {orgs[1].entity_name} connection"
-                )
+        orgs = list(islice((c for c in state.connections if c.entity_type == "organization"), 2))
+        if len(orgs) >= 2:
+            queries.append(
+                f"{orgs[0].entity_name} {orgs[1].entity_name} connection"
+            )
         
         return queries[:max_queries]
     
@@ -215,37 +254,35 @@ class ConnectionMapperAgent:
                 "key_people": [],
             }
         
-        by_type = {}
-        organizations = []
-        people = []
+        by_type = dict(Counter(conn.entity_type for conn in connections))
         
-        for conn in connections:
-            # Count by type
-            if conn.entity_type not in by_type:
-                by_type[conn.entity_type] = 0
-            by_type[conn.entity_type] += 1
-            
-            # Collect entities
-            if conn.entity_type == "organization":
-                organizations.append({
-                    "name": conn.entity_name,
-                    "relationship": conn.relationship,
-                    "confidence": conn.confidence,
-                })
-            elif conn.entity_type == "person":
-                people.append({
-                    "name": conn.entity_name,
-                    "relationship": conn.relationship,
-                    "confidence": conn.confidence,
-                })
-        
-        # Sort by confidence
-        organizations.sort(key=lambda x: x["confidence"], reverse=True)
-        people.sort(key=lambda x: x["confidence"], reverse=True)
+        # Collect entities
+        organizations = [
+            {
+                "name": conn.entity_name,
+                "relationship": conn.relationship,
+                "confidence": conn.confidence,
+            }
+            for conn in connections
+            if conn.entity_type == "organization"
+        ]
+        people = [
+            {
+                "name": conn.entity_name,
+                "relationship": conn.relationship,
+                "confidence": conn.confidence,
+            }
+            for conn in connections
+            if conn.entity_type == "person"
+        ]
+        
+        # Top 10 by confidence
+        organizations = heapq.nlargest(10, organizations, key=lambda x: x["confidence"])
+        people = heapq.nlargest(10, people, key=lambda x: x["confidence"])
         
         return {
             "total_connections": len(connections),
             "by_type": by_type,
-            "key_organizations": organizations[:10],
-            "key_people": people[:10],
+            "key_organizations": organizations,
+            "key_people": people,
         }
@@ -4,7 +4,11 @@ Fact Extractor Agent
 Extracts and structures factual information from search results.
 """
 
-import json
+import asyncio
+import re
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
 from typing import Any
 
 from ..models.model_manager import ModelManager, TaskType
@@ -12,16 +16,18 @@ from ..state import AgentState, Finding
 from ..utils.confidence import ConfidenceScorer
 
 
-# Extraction prompt template
-FACT_EXTRACTION_PROMPT = """You are an expert research analyst extracting factual information about a person or entity.
+# Runs of horizontal whitespace in scraped content
+WHITESPACE_PATTERN = re.compile(r"[ \t\r\f\v\xa0]+")
 
-TARGET: {target_name}
-{context}
+# A digit, or a capitalized word after the first: short lines like
+# "Born: 1984" or "CEO, Theranos" that are facts rather than page chrome
+FACT_HINT_PATTERN = re.compile(r"\d| [A-Z]")
 
-SEARCH RESULTS:
-{search_results}
+# Static extraction instructions, sent as the system message so the prompt
+# prefix is identical across calls and can be reused by provider prompt caching
+FACT_EXTRACTION_SYSTEM = """You are an expert research analyst extracting factual information about a person or entity.
 
-Extract all factual information about {target_name} from these search results. Focus on:
+Extract all factual information about the target from the search results you are given. Focus on:
 
 1. BIOGRAPHY: Birth date, birthplace, nationality, education, family
 2. PROFESSIONAL: Companies, job titles, career timeline, achievements
@@ -39,18 +45,36 @@ Respond with a JSON array of findings. Each finding must have:
 
 Example format:
 [
-  {{
+  {
     "category": "professional",
     "fact": "Served as CEO of Example Corp from 2015 to 2020",
     "source_urls": ["https://example.com/article"],
     "confidence_note": "Confirmed by company press release"
-  }}
+  }
 ]
 
 Extract ONLY verifiable facts, not opinions or speculation.
 """
 
 
+def fact_extraction_prompt(target_name: str, context: str, search_results: str) -> str:
+    """Render the per-call extraction input (an f-string, compiled once at import)."""
+    return f"""TARGET: {target_name}
+{context}
+
+SEARCH RESULTS:
+{search_results}
+
+Extract all factual information about {target_name} from these search results.
+"""
+
+
+@lru_cache(maxsize=256)
+def format_search_result(url: str, title: str, snippet: str) -> str:
+    """Format one search result entry (memoized, results recur across iterations)."""
+    return f"[Source: {url}]\nTitle: {title}\nSnippet: {snippet}\n"
+
+
 class FactExtractorAgent:
     """
     Extracts structured facts from search results.
@@ -80,16 +104,10 @@ class FactExtractorAgent:
     
     def _format_search_results(self, state: AgentState) -> str:
         """Format search results for the prompt."""
-        results_text = []
-        
-        for result in state.search_results[-20:]:  # Last 20 results
-            results_text.append(
-                f"[Source: {result.url}]\n"
-                f"Title: {result.title}\n"
-                f"Snippet: {result.snippet}\n"
-            )
-        
-        return "\n---\n".join(results_text)
+        return "\n---\n".join(
+            format_search_result(result.url, result.title, result.snippet)
+            for result in state.get_recent_search_results(20)  # Last 20 unique results
+        )
     
     async def extract(self, state: AgentState) -> list[Finding]:
         """
@@ -97,7 +115,7 @@ class FactExtractorAgent:
         
         Args:
             state: Current agent state with search results
-            
+        
         Returns:
             List of extracted Finding objects
         """
@@ -107,11 +125,12 @@ class FactExtractorAgent:
         # Build context from existing findings
         context = ""
         if state.findings:
-            existing = [f.fact for f in state.findings[:10]]
-            context = f"EXISTING FINDINGS (avoid duplicates):\n" + "\n".join(f"- {f}" for f in existing)
+            context = "EXISTING FINDINGS (avoid duplicates):\n- " + "\n- ".join(
+                f.fact for f in state.findings[:10]
+            )
         
         # Format prompt
-        prompt = FACT_EXTRACTION_PROMPT.format(
+        prompt = fact_extraction_prompt(
             target_name=state.target_name,
             context=context,
             search_results=self._format_search_results(state),
@@ -122,34 +141,54 @@ class FactExtractorAgent:
             prompt=prompt,
             schema=self.FINDING_SCHEMA,
             task_type=TaskType.FAST_EXTRACTION,
+            system_prompt=FACT_EXTRACTION_SYSTEM,
+            cache_namespace="fact_extraction",
         )
         
         findings = []
         
+        # Successful responses are validated JSON (schema-constrained output)
         if response.success:
-            try:
-                data = json.loads(response.content)
+            data = response.json()
+            
+            # Calculate confidence based on sources, for all items at once
+            url_lists = [item.get("source_urls", []) for item in data]
+            confidences = self.confidence_scorer.calculate_confidence_batch(url_lists).tolist()
+            extracted_at = datetime.now()  # One timestamp for the whole batch
+            
+            for item, source_urls, confidence in zip(data, url_lists, confidences):
+                finding = Finding(
+                    category=item.get("category", "unknown"),
+                    fact=item.get("fact", ""),
+                    source_urls=source_urls,
+                    confidence=confidence,
+                    extracted_at=extracted_at,
+                )
                 
-                for item in data:
-                    # Calculate confidence based on sources
-                    source_urls = item.get("source_urls", [])
-                    confidence = self.confidence_scorer.calculate_confidence(source_urls)
-                    
-                    finding = Finding(
-                        category=item.get("category", "unknown"),
-                        fact=item.get("fact", ""),
-                        source_urls=source_urls,
-                        confidence=confidence,
-                    )
-                    
-                    if finding.fact:  # Only add non-empty findings
-                        findings.append(finding)
-                        
-            except json.JSONDecodeError:
-                pass  # Return empty list on parse error
+                if finding.fact:  # Only add non-empty findings
+                    findings.append(finding)
         
         return findings
     
+    def _prepare_content(self, content: str, max_chars: int = 4000) -> str:
+        """
+        Clean scraped content and clip it to the prompt budget.
+        
+        Collapses whitespace, drops lines of fewer than three words (menus,
+        breadcrumbs and other page chrome) unless they hold a number or a
+        name, and cuts at a word boundary.
+        """
+        lines = (WHITESPACE_PATTERN.sub(" ", line).strip() for line in content.splitlines())
+        text = "\n".join(
+            line for line in lines
+            if line.count(" ") >= 2 or FACT_HINT_PATTERN.search(line)
+        )
+        
+        if len(text) <= max_chars:
+            return text
+        cut = max(text.rfind(" ", 0, max_chars + 1), text.rfind("\n", 0, max_chars + 1))
+        return text[:cut if cut > 0 else max_chars]
+    
     async def extract_from_content(
         self,
         content: str,
@@ -163,7 +202,7 @@ class FactExtractorAgent:
             content: Scraped text content
             target_name: Name of investigation target
             source_url: URL of the source
-            
+        
         Returns:
             List of extracted findings
         """
@@ -172,7 +211,7 @@ class FactExtractorAgent:
 SOURCE URL: {source_url}
 
 CONTENT:
-{content[:4000]}
+{self._prepare_content(content)}
 
 Extract specific facts with their categories. Respond as a JSON array:
 [
@@ -184,28 +223,55 @@ Extract specific facts with their categories. Respond as a JSON array:
             prompt=prompt,
             schema=self.FINDING_SCHEMA,
             task_type=TaskType.FAST_EXTRACTION,
+            cache_namespace="content_extraction",
         )
         
         findings = []
         
         if response.success:
-            try:
-                data = json.loads(response.content)
-                for item in data:
-                    source_urls = item.get("source_urls", [source_url])
-                    confidence = self.confidence_scorer.calculate_confidence(source_urls)
-                    
-                    finding = Finding(
-                        category=item.get("category", "unknown"),
-                        fact=item.get("fact", ""),
-                        source_urls=source_urls,
-                        confidence=confidence,
-                    )
-                    
-                    if finding.fact:
-                        findings.append(finding)
-                        
-            except json.JSONDecodeError:
-                pass
+            data = response.json()
+            url_lists = [item.get("source_urls", [source_url]) for item in data]
+            confidences = self.confidence_scorer.calculate_confidence_batch(url_lists).tolist()
+            extracted_at = datetime.now()  # One timestamp for the whole batch
+            
+            for item, source_urls, confidence in zip(data, url_lists, confidences):
+                finding = Finding(
+                    category=item.get("category", "unknown"),
+                    fact=item.get("fact", ""),
+                    source_urls=source_urls,
+                    confidence=confidence,
+                    extracted_at=extracted_at,
+                )
+                
+                if finding.fact:
+                    findings.append(finding)
         
         return findings
+    
+    async def extract_from_contents(
+        self,
+        items: list[tuple[str, str]],
+        target_name: str,
+        max_concurrency: int = 8,
+    ) -> list[Finding]:
+        """
+        Extract facts from many scraped pages concurrently.
+        
+        Args:
+            items: (content, source_url) pairs
+            target_name: Name of investigation target
+            max_concurrency: Maximum number of pages in flight at once
+        
+        Returns:
+            Findings from all pages, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def extract_one(content: str, source_url: str) -> list[Finding]:
+            async with semaphore:
+                return await self.extract_from_content(content, target_name, source_url)
+        
+        results = await asyncio.gather(
+            *(extract_one(content, source_url) for content, source_url in items)
+        )
+        return list(chain.from_iterable(results))
@@ -6,15 +6,18 @@ Coordinates all specialized agents in a stateful graph.
 """
 
 import asyncio
+from collections import Counter
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, AsyncIterator, Literal
 
 from langgraph.graph import StateGraph, END
 
 from ..config import get_settings
 from ..state import AgentState, InvestigationPhase, SearchResult
 from ..models.model_manager import ModelManager, TaskType
+from ..models.prompt_cache import ResponseCache, SemanticPromptCache
 from ..tools.search_tool import SerperSearchTool
 from ..tools.scraper_tool import WebScraperTool
 from ..utils.logger import AuditLogger
@@ -51,6 +54,25 @@ Respond with a JSON array of query strings:
 Make queries specific and targeted. Avoid generic queries.
 """
 
+# Report marker per severity 0-10 (red 7+, yellow 4-6, green below)
+SEVERITY_EMOJI = ("🟢",) * 4 + ("🟡",) * 3 + ("🔴",) * 4
+
+# Audit logger of the investigation running in the current context. Each run
+# sets its own, so concurrent runs on one orchestrator log to separate files
+current_logger: ContextVar[AuditLogger | None] = ContextVar("current_logger", default=None)
+
+# AgentState fields folded back from LangGraph state snapshots
+MERGED_FIELDS = (
+    "findings",
+    "risk_indicators",
+    "connections",
+    "search_results",
+    "final_report",
+    "iteration_count",
+    "current_phase",
+    "errors",
+)
+
 
 class ResearchOrchestrator:
     """
@@ -73,17 +95,30 @@ class ResearchOrchestrator:
         google_api_key: str,
         serper_api_key: str,
         output_dir: Path = Path("output"),
+        groq_rpm: int = 30,
     ):
+        # LLM responses are reused for repeated prompts (across runs) and for
+        # near-identical prompts (across iterations)
+        self.response_cache = ResponseCache(output_dir / "cache" / "llm" / "responses.sqlite3")
+        self.prompt_cache = SemanticPromptCache(path=output_dir / "cache" / "llm" / "prompts.sqlite3")
+        
         # Initialize model manager
         self.model_manager = ModelManager(
             groq_api_key=groq_api_key,
             google_api_key=google_api_key,
+            semantic_cache=self.prompt_cache,
+            response_cache=self.response_cache,
+            groq_rpm=groq_rpm,
         )
         
         # Initialize tools
         self.search_tool = SerperSearchTool(serper_api_key)
         self.scraper_tool = WebScraperTool()
         
+        # Output directory
+        self.output_dir = output_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
         # Initialize agents
         self.fact_extractor = FactExtractorAgent(self.model_manager)
         self.risk_analyzer = RiskAnalyzerAgent(self.model_manager)
@@ -93,16 +128,19 @@ class ResearchOrchestrator:
         # Confidence scorer
         self.confidence_scorer = ConfidenceScorer()
         
-        # Output directory
-        self.output_dir = output_dir
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Logger will be initialized per investigation
-        self.logger: AuditLogger | None = None
+        # Investigations in progress; close_when_idle() waits for them
+        self._active_runs = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
         
         # Build the workflow graph
         self.graph = self._build_graph()
     
+    @property
+    def logger(self) -> AuditLogger | None:
+        """Audit logger of the investigation running in the current context."""
+        return current_logger.get()
+    
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph workflow."""
         
@@ -111,9 +149,8 @@ class ResearchOrchestrator:
         
         # Add nodes
         workflow.add_node("initial_search", self._initial_search_node)
-        workflow.add_node("fact_extraction", self._fact_extraction_node)
+        workflow.add_node("extraction", self._extraction_node)
         workflow.add_node("risk_analysis", self._risk_analysis_node)
-        workflow.add_node("connection_mapping", self._connection_mapping_node)
         workflow.add_node("query_refinement", self._query_refinement_node)
         workflow.add_node("source_validation", self._source_validation_node)
         workflow.add_node("report_generation", self._report_generation_node)
@@ -122,11 +159,10 @@ class ResearchOrchestrator:
         workflow.set_entry_point("initial_search")
         
         # Add edges
-        workflow.add_edge("initial_search", "fact_extraction")
-        workflow.add_edge("fact_extraction", "risk_analysis")
-        workflow.add_edge("risk_analysis", "connection_mapping")
+        workflow.add_edge("initial_search", "extraction")
+        workflow.add_edge("extraction", "risk_analysis")
         workflow.add_conditional_edges(
-            "connection_mapping",
+            "risk_analysis",
             self._should_continue,
             {
                 "continue": "query_refinement",
@@ -160,16 +196,21 @@ class ResearchOrchestrator:
             queries = await self._generate_initial_queries(state.target_name, state.target_context)
             state.pending_queries = queries
         
-        # Execute searches
+        # Execute searches concurrently, 3 queries at a time
+        searched = set(state.search_history)
+        queries = [
+            query for query in dict.fromkeys(state.pending_queries[:3])
+            if query not in searched
+        ]
+        results_by_query = await self.search_tool.multi_search(queries)
+        
         new_results = []
-        for query in state.pending_queries[:3]:  # Process 3 queries at a time
-            if query not in state.search_history:
-                results = await self.search_tool.search(query)
-                state.search_history.append(query)
-                new_results.extend(results)
-                
-                if self.logger:
-                    self.logger.log_search(query, len(results), state.iteration_count)
+        for query, results in results_by_query.items():
+            state.search_history.append(query)
+            new_results.extend(results)
+            
+            if self.logger:
+                self.logger.log_search(query, len(results), state.iteration_count)
         
         # Clear processed queries
         state.pending_queries = state.pending_queries[3:]
@@ -180,15 +221,22 @@ class ResearchOrchestrator:
         
         return {"search_results": state.search_results, "iteration_count": state.iteration_count}
     
-    async def _fact_extraction_node(self, state: AgentState) -> dict[str, Any]:
-        """Extract facts from search results."""
+    async def _extraction_node(self, state: AgentState) -> dict[str, Any]:
+        """Extract facts and map connections from search results."""
         state.current_phase = InvestigationPhase.FACT_EXTRACTION
         
         if self.logger:
             self.logger.log_phase_change("initial_search", "fact_extraction")
         
-        # Extract findings
-        new_findings = await self.fact_extractor.extract(state)
+        # Both agents only read the state, so their LLM calls can run concurrently.
+        # Risk analysis stays a separate node after this one: its prompt is built
+        # from the findings extracted here.
+        # The task group cancels the other agent if one fails
+        errors_before = len(state.errors)
+        async with asyncio.TaskGroup() as group:
+            findings_task = group.create_task(self.fact_extractor.extract(state))
+            connections_task = group.create_task(self.connection_mapper.map_connections(state))
+        new_findings, new_connections = findings_task.result(), connections_task.result()
         
         # Add to state (deduplicating)
         for finding in new_findings:
@@ -203,7 +251,14 @@ class ResearchOrchestrator:
                 0,  # Latency tracked internally
             )
         
-        return {"findings": state.findings}
+        for conn in new_connections:
+            state.add_connection(conn)
+        
+        if self.logger:
+            for error in state.errors[errors_before:]:
+                self.logger.log_error(error, "fact_extraction")
+        
+        return {"findings": state.findings, "connections": state.connections, "errors": state.errors}
     
     async def _risk_analysis_node(self, state: AgentState) -> dict[str, Any]:
         """Analyze for risk patterns."""
@@ -222,21 +277,6 @@ class ResearchOrchestrator:
         
         return {"risk_indicators": state.risk_indicators}
     
-    async def _connection_mapping_node(self, state: AgentState) -> dict[str, Any]:
-        """Map entity connections."""
-        state.current_phase = InvestigationPhase.CONNECTION_MAPPING
-        
-        if self.logger:
-            self.logger.log_phase_change("risk_analysis", "connection_mapping")
-        
-        # Map connections
-        new_connections = await self.connection_mapper.map_connections(state)
-        
-        for conn in new_connections:
-            state.add_connection(conn)
-        
-        return {"connections": state.connections}
-    
     async def _query_refinement_node(self, state: AgentState) -> dict[str, Any]:
         """Generate refined queries based on findings."""
         # Generate follow-up queries based on connections
@@ -250,8 +290,9 @@ class ResearchOrchestrator:
         
         all_queries = connection_queries + validation_queries + gap_queries
         
-        # Filter out already-searched queries
-        new_queries = [q for q in all_queries if q not in state.search_history]
+        # Filter out repeated and already-searched queries
+        searched = set(state.search_history)
+        new_queries = [q for q in dict.fromkeys(all_queries) if q not in searched]
         
         if self.logger and new_queries:
             self.logger.log_query_refinement(
@@ -269,7 +310,7 @@ class ResearchOrchestrator:
         state.current_phase = InvestigationPhase.SOURCE_VALIDATION
         
         if self.logger:
-            self.logger.log_phase_change("connection_mapping", "source_validation")
+            self.logger.log_phase_change("risk_analysis", "source_validation")
         
         # Validate all findings
         validated = await self.source_validator.validate_all(state)
@@ -309,9 +350,7 @@ class ResearchOrchestrator:
     async def _generate_gap_queries(self, state: AgentState) -> list[str]:
         """Generate queries to fill knowledge gaps."""
         # Analyze what categories have low coverage
-        category_counts = {}
-        for finding in state.findings:
-            category_counts[finding.category] = category_counts.get(finding.category, 0) + 1
+        category_counts = Counter(finding.category for finding in state.findings)
         
         queries = []
         
@@ -336,8 +375,11 @@ class ResearchOrchestrator:
         connection_summary = self.connection_mapper.get_connection_summary(state.connections)
         validation_summary = self.source_validator.get_validation_summary(state.findings)
         
-        # Build report
-        report = f"""# Investigation Report: {state.target_name}
+        # Build report from parts, joined once at the end
+        parts: list[str] = []
+        append = parts.append
+        
+        append(f"""# Investigation Report: {state.target_name}
 
 **Generated:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 **Search Iterations:** {state.iteration_count}
@@ -355,62 +397,68 @@ class ResearchOrchestrator:
 
 ## Biographical & Professional Profile
 
-"""
+""")
+        # Bucket findings by category in one pass
+        findings_by_category: dict[str, list] = {}
+        for finding in state.findings:
+            findings_by_category.setdefault(finding.category, []).append(finding)
+        
         # Add findings by category
+        confidence_label = self.confidence_scorer.get_confidence_label
         categories = ["biography", "professional", "financial", "associations"]
         for category in categories:
-            cat_findings = [f for f in state.findings if f.category == category]
+            cat_findings = findings_by_category.get(category)
             if cat_findings:
-                report += f"### {category.title()}\n\n"
+                append(f"### {category.title()}\n\n")
                 for finding in cat_findings:
-                    conf_label = self.confidence_scorer.get_confidence_label(finding.confidence)
+                    conf_label = confidence_label(finding.confidence)
                     verified = "✓" if finding.verified else ""
-                    report += f"- {finding.fact} [{conf_label}] {verified}\n"
-                report += "\n"
+                    append(f"- {finding.fact} [{conf_label}] {verified}\n")
+                append("\n")
         
         # Risk section
-        report += """---
+        append("""---
 
 ## Risk Assessment
 
-"""
+""")
         if state.risk_indicators:
             for risk in sorted(state.risk_indicators, key=lambda r: r.severity, reverse=True):
-                severity_emoji = "🔴" if risk.severity >= 7 else "🟡" if risk.severity >= 4 else "🟢"
-                report += f"""### {severity_emoji} {risk.category.title()} Risk (Severity: {risk.severity}/10)
+                severity_emoji = SEVERITY_EMOJI[min(max(int(risk.severity), 0), 10)]
+                append(f"""### {severity_emoji} {risk.category.title()} Risk (Severity: {risk.severity}/10)
 
 **Description:** {risk.description}
 
 **Evidence:**
-"""
+""")
                 for evidence in risk.evidence:
-                    report += f"- {evidence}\n"
-                report += f"\n**Confidence:** {risk.confidence:.0%}\n\n"
+                    append(f"- {evidence}\n")
+                append(f"\n**Confidence:** {risk.confidence:.0%}\n\n")
         else:
-            report += "*No significant risks identified.*\n\n"
+            append("*No significant risks identified.*\n\n")
         
         # Connections section
-        report += """---
+        append("""---
 
 ## Network & Connections
 
-"""
-        report += f"**Total Connections Mapped:** {connection_summary['total_connections']}\n\n"
+""")
+        append(f"**Total Connections Mapped:** {connection_summary['total_connections']}\n\n")
         
         if connection_summary.get('key_organizations'):
-            report += "### Key Organizations\n\n"
+            append("### Key Organizations\n\n")
             for org in connection_summary['key_organizations'][:5]:
-                report += f"- **{org['name']}** - {org['relationship']} ({org['confidence']:.0%} confidence)\n"
-            report += "\n"
+                append(f"- **{org['name']}** - {org['relationship']} ({org['confidence']:.0%} confidence)\n")
+            append("\n")
         
         if connection_summary.get('key_people'):
-            report += "### Key People\n\n"
+            append("### Key People\n\n")
             for person in connection_summary['key_people'][:5]:
-                report += f"- **{person['name']}** - {person['relationship']} ({person['confidence']:.0%} confidence)\n"
-            report += "\n"
+                append(f"- **{person['name']}** - {person['relationship']} ({person['confidence']:.0%} confidence)\n")
+            append("\n")
         
         # Validation summary
-        report += f"""---
+        append(f"""---
 
 ## Source Validation Summary
 
@@ -432,9 +480,9 @@ This report was generated using an automated research agent that:
 5. Cross-referenced findings for validation
 
 *Note: All findings should be independently verified before making decisions.*
-"""
+""")
         
-        return report
+        return "".join(parts)
     
     async def investigate(
         self,
@@ -449,14 +497,40 @@ This report was generated using an automated research agent that:
             target_name: Name of person/entity to investigate
             context: Additional context about the target
             max_iterations: Maximum search iterations
-            
+        
         Returns:
             Final AgentState with all findings
         """
-        # Initialize logger
+        final_state = None
+        async for final_state in self.investigate_stream(target_name, context, max_iterations):
+            pass
+        return final_state
+    
+    async def investigate_stream(
+        self,
+        target_name: str,
+        context: str = "",
+        max_iterations: int = 10,
+    ) -> AsyncIterator[AgentState]:
+        """
+        Run a full investigation, yielding state snapshots as it progresses.
+        
+        Args:
+            target_name: Name of person/entity to investigate
+            context: Additional context about the target
+            max_iterations: Maximum search iterations
+        
+        Yields:
+            AgentState after each workflow step; the last one is final
+        """
+        # Initialize this run's logger; graph nodes see it through the context
         logs_dir = self.output_dir / "logs"
         logs_dir.mkdir(parents=True, exist_ok=True)
-        self.logger = AuditLogger(logs_dir, target_name)
+        logger = AuditLogger(logs_dir, target_name)
+        token = current_logger.set(logger)
+        
+        self._active_runs += 1
+        self._idle.clear()
         
         # Create initial state
         initial_state = AgentState(
@@ -466,54 +540,68 @@ This report was generated using an automated research agent that:
         )
         
         try:
-            # Run the graph
-            result = await self.graph.ainvoke(initial_state)
-            
-            # LangGraph returns a dict-like object, convert to AgentState
-            if isinstance(result, dict):
-                # Update initial state with results
-                if "findings" in result:
-                    initial_state.findings = result["findings"]
-                if "risk_indicators" in result:
-                    initial_state.risk_indicators = result["risk_indicators"]
-                if "connections" in result:
-                    initial_state.connections = result["connections"]
-                if "search_results" in result:
-                    initial_state.search_results = result["search_results"]
-                if "final_report" in result:
-                    initial_state.final_report = result["final_report"]
-                if "iteration_count" in result:
-                    initial_state.iteration_count = result["iteration_count"]
-                if "current_phase" in result:
-                    initial_state.current_phase = result["current_phase"]
-                
-                final_state = initial_state
-            else:
-                final_state = result
+            # Run the graph, emitting the full state after every node
+            final_state = initial_state
+            async for result in self.graph.astream(initial_state, stream_mode="values"):
+                final_state = self._merge_result(initial_state, result)
+                yield final_state
             
             # Save report
             await self._save_report(final_state)
             
             # Print summary
-            if self.logger:
-                self.logger.print_summary()
-            
-            return final_state
-            
+            logger.print_summary()
+        
         except Exception as e:
-            if self.logger:
-                self.logger.log_error(str(e), "investigation")
+            logger.log_error(str(e), "investigation")
             raise
         
         finally:
-            # Cleanup
-            await self.search_tool.close()
-            await self.scraper_tool.close()
+            await asyncio.to_thread(logger.close)
+            
+            self._active_runs -= 1
+            if not self._active_runs:
+                self._idle.set()
+            current_logger.reset(token)
+    
+    async def close(self):
+        """
+        Close the HTTP clients and the LLM caches.
+        
+        Clients are kept open between investigations so their connection
+        pools are reused; call this once when done with the orchestrator.
+        """
+        await self.search_tool.close()
+        await self.scraper_tool.close()
+        await self.model_manager.close()
+        self.response_cache.close()
+        self.prompt_cache.close()
+    
+    async def close_when_idle(self):
+        """Close the orchestrator once no investigation is running on it."""
+        await self._idle.wait()
+        await self.close()
+    
+    def _merge_result(self, state: AgentState, result: Any) -> AgentState:
+        """Fold a LangGraph state snapshot back into an AgentState."""
+        # LangGraph returns a dict-like object, convert to AgentState
+        if not isinstance(result, dict):
+            return result
+        
+        # Update state with results, copying lists so the returned state
+        # doesn't alias lists the graph may still mutate
+        for key in MERGED_FIELDS:
+            if key in result:
+                value = result[key]
+                setattr(state, key, list(value) if isinstance(value, list) else value)
+        
+        return state
     
     async def _save_report(self, state: AgentState) -> Path:
         """Save the investigation report."""
+        # File I/O runs in a worker thread so it doesn't block the event loop
         reports_dir = self.output_dir / "reports"
-        reports_dir.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(reports_dir.mkdir, parents=True, exist_ok=True)
         
         # Handle both AgentState object and dict
         if isinstance(state, dict):
@@ -529,6 +617,6 @@ This report was generated using an automated research agent that:
         filename = f"{safe_name}_{timestamp}_report.md"
         
         filepath = reports_dir / filename
-        filepath.write_text(final_report)
+        await asyncio.to_thread(filepath.write_text, final_report)
         
         return filepath
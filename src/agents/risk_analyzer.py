@@ -5,14 +5,25 @@ Identifies potential red flags and risk patterns.
 """
 
 import json
+from functools import lru_cache
 from typing import Any
 
+import ahocorasick
+import numpy as np
+
 from ..models.model_manager import ModelManager, TaskType
 from ..state import AgentState, RiskIndicator
 from ..utils.confidence import ConfidenceScorer
 
 
-RISK_ANALYSIS_PROMPT = """You are a risk assessment expert analyzing information about an individual or entity.
+def risk_analysis_prompt(
+    target_name: str,
+    findings: str,
+    search_results: str,
+    keyword_hits: str,
+) -> str:
+    """Build the risk analysis prompt from pre-formatted sections."""
+    return f"""You are a risk assessment expert analyzing information about an individual or entity.
 
 TARGET: {target_name}
 
@@ -22,6 +33,9 @@ FINDINGS TO ANALYZE:
 SEARCH RESULTS (for additional context):
 {search_results}
 
+KEYWORD SCAN HITS (possible red flags to check against the evidence):
+{keyword_hits}
+
 Analyze this information and identify any risk indicators. Look for:
 
 1. LEGAL RISKS: Lawsuits, investigations, arrests, convictions, regulatory actions
@@ -52,6 +66,21 @@ Only flag genuine risks with supporting evidence. Do not flag normal business ac
 """
 
 
+@lru_cache(maxsize=1024)
+def format_finding(category: str, fact: str, confidence: float) -> str:
+    """Format one finding line; unchanged findings reuse their line across iterations."""
+    return f"[{category.upper()}] {fact} (Confidence: {confidence:.0%})"
+
+
+def _keyword_automaton(keywords: list[str]) -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton that reports each matched keyword."""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
 class RiskAnalyzerAgent:
     """
     Analyzes findings to identify risk patterns and red flags.
@@ -87,21 +116,23 @@ class RiskAnalyzerAgent:
         "bankruptcy", "misappropriation", "embezzlement",
     ]
     
+    # Finding categories worth a model call even without keyword hits
+    RISK_RELEVANT_CATEGORIES = frozenset({"controversies", "legal", "financial"})
+    
+    # All keywords in one automaton, so each snippet is scanned once in a
+    # single linear pass however many keywords there are
+    HIGH_RISK_AUTOMATON = _keyword_automaton(HIGH_RISK_KEYWORDS)
+    
     def __init__(self, model_manager: ModelManager):
         self.model_manager = model_manager
         self.confidence_scorer = ConfidenceScorer()
     
     def _format_findings(self, state: AgentState) -> str:
         """Format findings for analysis."""
-        findings_text = []
-        
-        for finding in state.findings:
-            findings_text.append(
-                f"[{finding.category.upper()}] {finding.fact} "
-                f"(Confidence: {finding.confidence:.0%})"
-            )
-        
-        return "\n".join(findings_text) if findings_text else "No findings yet."
+        return "\n".join(
+            format_finding(finding.category, finding.fact, finding.confidence)
+            for finding in state.findings
+        ) or "No findings yet."
     
     def _format_search_results(self, state: AgentState) -> str:
         """Format recent search results."""
@@ -110,26 +141,28 @@ class RiskAnalyzerAgent:
             results.append(f"- {result.title}: {result.snippet[:200]}")
         return "\n".join(results) if results else "No results."
     
-    def _quick_risk_scan(self, state: AgentState) -> list[str]:
-        """Quick keyword scan for potential risks."""
+    def _quick_risk_scan(self, state: AgentState, limit: int = 10) -> list[str]:
+        """Quick keyword scan for potential risks, stopping at the first `limit` hits."""
         potential_risks = []
         
         # Scan search result snippets
         for result in state.search_results:
-            snippet_lower = result.snippet.lower()
-            for keyword in self.HIGH_RISK_KEYWORDS:
-                if keyword in snippet_lower:
-                    potential_risks.append(
-                        f"Found '{keyword}' in: {result.title}"
-                    )
-                    break
+            match = next(self.HIGH_RISK_AUTOMATON.iter(result.snippet_lower), None)
+            if match:
+                potential_risks.append(
+                    f"Found '{match[1]}' in: {result.title}"
+                )
+                if len(potential_risks) == limit:
+                    return potential_risks
         
         # Scan findings
         for finding in state.findings:
             if finding.category == "controversies":
                 potential_risks.append(f"Controversy finding: {finding.fact[:100]}")
+                if len(potential_risks) == limit:
+                    break
         
-        return potential_risks[:10]  # Limit to 10
+        return potential_risks
     
     async def analyze(self, state: AgentState) -> list[RiskIndicator]:
         """
@@ -141,35 +174,42 @@ class RiskAnalyzerAgent:
         Returns:
             List of RiskIndicator objects
         """
-        # Quick scan first
+        # Quick scan first; its hits also go into the prompt
         quick_risks = self._quick_risk_scan(state)
         
-        if not state.findings and not quick_risks:
+        # Without keyword hits or risk-relevant findings the model reliably
+        # returns an empty list, so skip the call
+        if not quick_risks and not any(
+            f.category in self.RISK_RELEVANT_CATEGORIES for f in state.findings
+        ):
             return []
         
         # Use Gemini for complex reasoning
-        prompt = RISK_ANALYSIS_PROMPT.format(
+        prompt = risk_analysis_prompt(
             target_name=state.target_name,
             findings=self._format_findings(state),
             search_results=self._format_search_results(state),
+            keyword_hits="\n".join(f"- {hit}" for hit in quick_risks) or "None.",
         )
         
         response = await self.model_manager.generate_structured(
             prompt=prompt,
             schema=self.RISK_SCHEMA,
             task_type=TaskType.COMPLEX_REASONING,  # Use Gemini for this
+            cache_namespace="risk_analysis",
         )
         
         risks = []
         
         if response.success:
             try:
-                data = json.loads(response.content)
+                data = response.json()
                 
-                for item in data:
-                    source_urls = item.get("source_urls", [])
-                    confidence = self.confidence_scorer.calculate_confidence(source_urls)
-                    
+                # Score every risk's sources in one batch
+                url_lists = [item.get("source_urls", []) for item in data]
+                confidences = self.confidence_scorer.calculate_confidence_batch(url_lists).tolist()
+                
+                for item, source_urls, confidence in zip(data, url_lists, confidences):
                     risk = RiskIndicator(
                         category=item.get("category", "unknown"),
                         description=item.get("description", ""),
@@ -202,24 +242,24 @@ class RiskAnalyzerAgent:
             }
         
         # Weight by severity and confidence
-        weighted_scores = []
-        category_scores = {}
-        
-        for risk in risks:
-            weighted = risk.severity * risk.confidence
-            weighted_scores.append(weighted)
-            
-            if risk.category not in category_scores:
-                category_scores[risk.category] = []
-            category_scores[risk.category].append(weighted)
+        severities = np.fromiter((r.severity for r in risks), dtype=np.float64, count=len(risks))
+        confidences = np.fromiter((r.confidence for r in risks), dtype=np.float64, count=len(risks))
+        weighted = severities * confidences
         
         # Overall score (0-10)
-        overall = min(10, sum(weighted_scores) / max(len(weighted_scores), 1) * 1.2)
+        overall = min(10, float(weighted.mean()) * 1.2)
         
-        # Category breakdown
+        # Category breakdown, categories in first-seen order
+        category_ids: dict[str, int] = {}
+        codes = np.fromiter(
+            (category_ids.setdefault(r.category, len(category_ids)) for r in risks),
+            dtype=np.int64,
+            count=len(risks),
+        )
+        category_means = np.bincount(codes, weights=weighted) / np.bincount(codes)
         breakdown = {
-            cat: round(sum(scores) / len(scores), 1)
-            for cat, scores in category_scores.items()
+            cat: round(float(category_means[i]), 1)
+            for cat, i in category_ids.items()
         }
         
         # Risk level
@@ -235,5 +275,5 @@ class RiskAnalyzerAgent:
             "risk_level": level,
             "breakdown": breakdown,
             "num_risks": len(risks),
-            "critical_risks": len([r for r in risks if r.severity >= 7]),
+            "critical_risks": int((severities >= 7).sum()),
         }
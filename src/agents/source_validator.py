@@ -4,15 +4,36 @@ Source Validator Agent
 Cross-references findings and validates source reliability.
 """
 
-import json
+import asyncio
+import re
+from itertools import islice
 from typing import Any
 
+import orjson
+
 from ..models.model_manager import ModelManager, TaskType
-from ..state import AgentState, Finding
+from ..state import AgentState, Finding, SearchResult
 from ..utils.confidence import ConfidenceScorer
 
 
-VALIDATION_PROMPT = """You are a fact-checker validating information about {target_name}.
+WORD_PATTERN = re.compile(r"\S+")
+
+
+def first_words(text: str, count: int) -> str:
+    """Return the first words of text, without splitting the rest of it."""
+    return " ".join(match.group() for match in islice(WORD_PATTERN.finditer(text), count))
+
+
+def validation_prompt(
+    target_name: str,
+    claim: str,
+    category: str,
+    sources: str,
+    confidence: str,
+    search_results: str,
+) -> str:
+    """Build the prompt for validating a single finding."""
+    return f"""You are a fact-checker validating information about {target_name}.
 
 FINDING TO VALIDATE:
 Claim: {claim}
@@ -45,6 +66,43 @@ A claim is CONTRADICTED if:
 """
 
 
+def batch_validation_prompt(target_name: str, claims: str, search_results: str) -> str:
+    """Build the prompt for validating several numbered findings at once."""
+    return f"""You are a fact-checker validating information about {target_name}.
+
+FINDINGS TO VALIDATE:
+{claims}
+
+ADDITIONAL SEARCH RESULTS (for cross-reference):
+{search_results}
+
+Analyze, for each finding separately, whether the additional search results support or contradict its claim.
+
+Respond with JSON containing one result per finding, using the finding's number as its id:
+{{
+  "results": [
+    {{
+      "id": 1,
+      "supported": true/false,
+      "contradicted": false/true,
+      "supporting_sources": ["urls that support the claim"],
+      "contradicting_sources": ["urls that contradict"],
+      "notes": "Explanation of your assessment",
+      "revised_confidence": 0.0-1.0
+    }}
+  ]
+}}
+
+A claim is SUPPORTED if:
+- Multiple independent sources confirm it
+- Official records or major news outlets verify it
+
+A claim is CONTRADICTED if:
+- Credible sources dispute it
+- There are significant inconsistencies
+"""
+
+
 class SourceValidatorAgent:
     """
     Validates findings through cross-referencing and source analysis.
@@ -68,20 +126,61 @@ class SourceValidatorAgent:
         "required": ["supported", "contradicted", "revised_confidence"],
     }
     
+    BATCH_VALIDATION_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        **VALIDATION_SCHEMA["properties"],
+                    },
+                    "required": ["id", *VALIDATION_SCHEMA["required"]],
+                },
+            },
+        },
+        "required": ["results"],
+    }
+    
     def __init__(self, model_manager: ModelManager):
         self.model_manager = model_manager
         self.confidence_scorer = ConfidenceScorer()
+        
+        # Last search results formatted for a prompt, and their rendering
+        self._formatted_results: tuple[list[SearchResult], str] = ([], "No additional results.")
     
     def _format_search_results(self, state: AgentState) -> str:
-        """Format search results for validation."""
-        results = []
-        for result in state.search_results[-10:]:
-            results.append(
+        """Format search results for validation, reusing the last rendering if they are unchanged."""
+        results = state.search_results[-10:]
+        if results != self._formatted_results[0]:
+            self._formatted_results = (results, "\n---\n".join([
                 f"[{result.url}]\n"
                 f"Title: {result.title}\n"
                 f"Content: {result.snippet}"
+                for result in results
+            ]) or "No additional results.")
+        return self._formatted_results[1]
+    
+    def _apply_validation(self, finding: Finding, data: dict[str, Any]) -> None:
+        """Update a finding in place from the model's assessment of it."""
+        if data.get("supported"):
+            # Add supporting sources and increase confidence
+            new_sources = data.get("supporting_sources", [])
+            finding.source_urls.extend(new_sources)
+            finding.verified = True
+            
+            # Recalculate confidence with new sources
+            finding.confidence = min(
+                1.0,
+                max(finding.confidence, data.get("revised_confidence", finding.confidence))
             )
-        return "\n---\n".join(results) if results else "No additional results."
+        
+        elif data.get("contradicted"):
+            # Reduce confidence for contradicted findings
+            finding.confidence = max(0.1, finding.confidence * 0.5)
+            finding.verified = False
     
     async def validate_finding(
         self,
@@ -94,11 +193,11 @@ class SourceValidatorAgent:
         Args:
             finding: Finding to validate
             state: Current state with search results
-            
+        
         Returns:
             Updated Finding with revised confidence
         """
-        prompt = VALIDATION_PROMPT.format(
+        prompt = validation_prompt(
             target_name=state.target_name,
             claim=finding.fact,
             category=finding.category,
@@ -115,55 +214,109 @@ class SourceValidatorAgent:
         
         if response.success:
             try:
-                data = json.loads(response.content)
-                
-                # Update finding based on validation
-                if data.get("supported"):
-                    # Add supporting sources and increase confidence
-                    new_sources = data.get("supporting_sources", [])
-                    finding.source_urls.extend(new_sources)
-                    finding.verified = True
-                    
-                    # Recalculate confidence with new sources
-                    finding.confidence = min(
-                        1.0,
-                        max(finding.confidence, data.get("revised_confidence", finding.confidence))
-                    )
-                    
-                elif data.get("contradicted"):
-                    # Reduce confidence for contradicted findings
-                    finding.confidence = max(0.1, finding.confidence * 0.5)
-                    finding.verified = False
-                    
-            except json.JSONDecodeError:
+                self._apply_validation(finding, response.json())
+            except orjson.JSONDecodeError:
                 pass
         
         return finding
     
+    async def validate_batch(
+        self,
+        findings: list[Finding],
+        state: AgentState,
+    ) -> list[Finding]:
+        """
+        Validate several findings with one request.
+        
+        The findings share a single copy of the search results in the
+        prompt, so this costs one round trip instead of one per finding.
+        
+        Args:
+            findings: Findings to validate
+            state: Current state with search results
+        
+        Returns:
+            Updated findings, in the same order; findings the model gave no
+            result for are returned unchanged
+        """
+        if len(findings) == 1:
+            return [await self.validate_finding(findings[0], state)]
+        
+        claims = "\n".join(
+            f"[{i}] Claim: {finding.fact}\n"
+            f"    Category: {finding.category}\n"
+            f"    Current sources: {', '.join(finding.source_urls[:3])}\n"
+            f"    Current confidence: {finding.confidence:.0%}"
+            for i, finding in enumerate(findings, 1)
+        )
+        prompt = batch_validation_prompt(
+            target_name=state.target_name,
+            claims=claims,
+            search_results=self._format_search_results(state),
+        )
+        
+        response = await self.model_manager.generate_structured(
+            prompt=prompt,
+            schema=self.BATCH_VALIDATION_SCHEMA,
+            task_type=TaskType.COMPLEX_REASONING,
+        )
+        
+        if response.success:
+            try:
+                for data in response.json().get("results", []):
+                    index = data.get("id")
+                    if isinstance(index, int) and 1 <= index <= len(findings):
+                        self._apply_validation(findings[index - 1], data)
+            except (orjson.JSONDecodeError, AttributeError):
+                pass
+        
+        return findings
+    
     async def validate_all(
         self,
         state: AgentState,
         min_confidence: float = 0.5,
+        max_concurrency: int = 5,
+        batch_size: int = 5,
     ) -> list[Finding]:
         """
         Validate all findings that need verification.
         
+        Findings are validated in batches of up to batch_size per request,
+        and batches run concurrently.
+        
         Args:
             state: Current agent state
             min_confidence: Verify findings below this confidence
-            
+            max_concurrency: Maximum requests in flight at once
+            batch_size: Maximum findings per request
+        
         Returns:
-            List of validated findings
+            List of validated findings, in the original order
         """
-        validated = []
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        for finding in state.findings:
-            if finding.confidence < min_confidence or not finding.verified:
-                # Needs validation
-                validated_finding = await self.validate_finding(finding, state)
-                validated.append(validated_finding)
-            else:
-                validated.append(finding)
+        async def validate(batch: list[Finding]) -> list[Finding]:
+            async with semaphore:
+                return await self.validate_batch(batch, state)
+        
+        # Needs validation
+        to_validate = [
+            i for i, finding in enumerate(state.findings)
+            if finding.confidence < min_confidence or not finding.verified
+        ]
+        batches = [to_validate[i:i + batch_size] for i in range(0, len(to_validate), batch_size)]
+        results = await asyncio.gather(
+            *(validate([state.findings[i] for i in batch]) for batch in batches),
+            return_exceptions=True,
+        )
+        
+        # A failed batch leaves its findings unchanged
+        validated = list(state.findings)
+        for batch, result in zip(batches, results):
+            if not isinstance(result, BaseException):
+                for i, finding in zip(batch, result):
+                    validated[i] = finding
         
         return validated
     
@@ -178,7 +331,7 @@ class SourceValidatorAgent:
         Args:
             state: Current agent state
             max_queries: Maximum queries to generate
-            
+        
         Returns:
             List of validation search queries
         """
@@ -194,19 +347,19 @@ class SourceValidatorAgent:
             # Generate a focused verification query
             if finding.category == "biography":
                 queries.append(
-                    f"{state.target_name} biography {finding.fact.split()[:3]}"
+                    f"{state.target_name} biography {first_words(finding.fact, 3)}"
                 )
             elif finding.category == "professional":
                 queries.append(
-                    f"{state.target_name} career {finding.fact.split()[:4]}"
+                    f"{state.target_name} career {first_words(finding.fact, 4)}"
                 )
             elif finding.category == "controversies":
                 queries.append(
-                    f"{state.target_name} {finding.fact.split()[:3]} news"
+                    f"{state.target_name} {first_words(finding.fact, 3)} news"
                 )
             else:
                 queries.append(
-                    f"{state.target_name} verify {finding.fact.split()[:3]}"
+                    f"{state.target_name} verify {first_words(finding.fact, 3)}"
                 )
         
         return queries
@@ -219,14 +372,18 @@ class SourceValidatorAgent:
             Dictionary with validation metrics
         """
         total = len(findings)
-        verified = len([f for f in findings if f.verified])
-        high_confidence = len([f for f in findings if f.confidence >= 0.7])
-        low_confidence = len([f for f in findings if f.confidence < 0.4])
+        verified = high_confidence = low_confidence = 0
+        confidence_sum = 0.0
         
-        avg_confidence = (
-            sum(f.confidence for f in findings) / total
-            if total > 0 else 0
-        )
+        # One pass; booleans count as 0/1
+        for f in findings:
+            confidence = f.confidence
+            confidence_sum += confidence
+            verified += f.verified
+            high_confidence += confidence >= 0.7
+            low_confidence += confidence < 0.4
+        
+        avg_confidence = confidence_sum / total if total > 0 else 0
         
         return {
             "total_findings": total,
@@ -5,7 +5,7 @@ Centralized configuration management using Pydantic Settings.
 Loads from environment variables and .env file.
 """
 
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -20,6 +20,7 @@ class Settings(BaseSettings):
         env_file=".env",
         env_file_encoding="utf-8",
         case_sensitive=False,
+        frozen=True,
     )
     
     # API Keys
@@ -36,6 +37,10 @@ class Settings(BaseSettings):
         default="gemini-2.0-flash",
         description="Gemini model to use"
     )
+    groq_rpm: int = Field(
+        default=30,
+        description="Groq requests per minute, shared by both models (0 disables the limit)"
+    )
     
     # Agent Configuration
     max_search_iterations: int = Field(
@@ -59,12 +64,12 @@ class Settings(BaseSettings):
         description="Output directory for reports and logs"
     )
     
-    @property
+    @cached_property
     def reports_dir(self) -> Path:
         """Path to reports directory."""
         return self.output_dir / "reports"
     
-    @property
+    @cached_property
     def logs_dir(self) -> Path:
         """Path to logs directory."""
         return self.output_dir / "logs"
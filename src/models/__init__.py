@@ -4,5 +4,6 @@ from .base_model import BaseModel, ModelResponse
 from .groq_model import GroqModel
 from .gemini_model import GeminiModel
 from .model_manager import ModelManager
+from .prompt_cache import SemanticPromptCache
 
-__all__ = ["BaseModel", "ModelResponse", "GroqModel", "GeminiModel", "ModelManager"]
+__all__ = ["BaseModel", "ModelResponse", "GroqModel", "GeminiModel", "ModelManager", "SemanticPromptCache"]
@@ -7,9 +7,11 @@ Provides consistent interface for multi-model integration.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 from enum import Enum
 
+import orjson
+
 
 class ModelType(Enum):
     """Supported model types."""
@@ -27,11 +29,26 @@ class ModelResponse:
     latency_ms: float = 0.0
     raw_response: Optional[Any] = None
     error: Optional[str] = None
+    # Decoded JSON content; not copied by dataclasses.replace, so copies of
+    # a cached response never share it
+    parsed: Any = field(default=None, init=False, repr=False, compare=False)
     
     @property
     def success(self) -> bool:
         """Check if response was successful."""
         return self.error is None and self.content is not None
+    
+    def json(self) -> Any:
+        """
+        Return the content decoded as JSON.
+        
+        Structured responses arrive already decoded by the model wrapper;
+        anything else (e.g. a response restored from a cache) is decoded on
+        first use.
+        """
+        if self.parsed is None:
+            self.parsed = orjson.loads(self.content)
+        return self.parsed
 
 
 class BaseModel(ABC):
@@ -58,7 +75,7 @@ class BaseModel(ABC):
             system_prompt: Optional system instructions
             temperature: Sampling temperature (0.0 - 1.0)
             max_tokens: Maximum tokens in response
-            
+        
         Returns:
             ModelResponse with content or error
         """
@@ -78,11 +95,34 @@ class BaseModel(ABC):
             prompt: User prompt/query
             schema: JSON schema for expected output
             system_prompt: Optional system instructions
-            
+        
         Returns:
             ModelResponse with JSON content
         """
         pass
     
+    async def stream_structured(
+        self,
+        prompt: str,
+        schema: dict[str, Any],
+        system_prompt: Optional[str] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Generate a structured JSON array response, yielding items as they complete.
+        
+        The default implementation waits for the full response; models that
+        support token streaming override it.
+        
+        Raises:
+            ValueError: If the response fails or is not valid JSON
+        """
+        response = await self.generate_structured(prompt, schema, system_prompt)
+        if not response.success:
+            raise ValueError(response.error)
+        
+        data = response.json()
+        for item in data if isinstance(data, list) else [data]:
+            yield item
+    
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(model={self.model_name})"
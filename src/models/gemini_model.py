@@ -5,9 +5,9 @@ Used for complex reasoning and fallback when Groq is rate-limited.
 """
 
 import time
-import json
 from typing import Any, Optional
 
+import orjson
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
@@ -27,6 +27,9 @@ class GeminiModel(BaseModel):
             google_api_key=api_key,
             model=model_name,
         )
+        
+        # Rendered structured-output system messages, per schema and system prompt
+        self._structured_systems: dict[tuple, tuple[dict[str, Any], str]] = {}
     
     async def generate(
         self,
@@ -34,9 +37,10 @@ class GeminiModel(BaseModel):
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        **kwargs: Any,
     ) -> ModelResponse:
-        """Generate text response using Gemini."""
-        start_time = time.time()
+        """Generate text response using Gemini. Extra kwargs are passed to the API call."""
+        start_ns = time.perf_counter_ns()
         
         try:
             messages = []
@@ -44,13 +48,15 @@ class GeminiModel(BaseModel):
                 messages.append(SystemMessage(content=system_prompt))
             messages.append(HumanMessage(content=prompt))
             
-            # Update client settings
-            self.client.temperature = temperature
-            self.client.max_output_tokens = max_tokens
-            
-            response = await self.client.ainvoke(messages)
+            # Per-call settings, so concurrent calls don't race on the shared client
+            response = await self.client.ainvoke(
+                messages,
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                **kwargs,
+            )
             
-            latency_ms = (time.time() - start_time) * 1000
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             # Extract token usage if available
             tokens_used = 0
@@ -66,53 +72,64 @@ class GeminiModel(BaseModel):
                 tokens_used=tokens_used,
                 raw_response=response,
             )
-            
+        
         except Exception as e:
             return ModelResponse(
                 content="",
                 model_type=self.model_type,
                 model_name=self.model_name,
                 error=str(e),
-                latency_ms=(time.time() - start_time) * 1000,
+                latency_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
             )
     
+    def _structured_system(self, schema: dict[str, Any], system_prompt: Optional[str]) -> str:
+        """Build the system message for structured output, rendering each schema once."""
+        key = (id(schema), system_prompt)
+        cached = self._structured_systems.get(key)
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        
+        enhanced_system = system_prompt or ""
+        enhanced_system += f"""
+
+IMPORTANT: Respond ONLY with valid JSON matching this schema:
+{orjson.dumps(schema, option=orjson.OPT_INDENT_2).decode()}
+
+Do not include any text outside the JSON object. No markdown formatting."""
+        enhanced_system += "\nYou are a precise data extraction assistant. Always respond with valid JSON only, no markdown code blocks."
+        
+        # The schema is held so its id is not reused while it is cached
+        if len(self._structured_systems) >= 64:
+            self._structured_systems.clear()
+        self._structured_systems[key] = (schema, enhanced_system)
+        return enhanced_system
+    
     async def generate_structured(
         self,
         prompt: str,
         schema: dict[str, Any],
         system_prompt: Optional[str] = None,
     ) -> ModelResponse:
-        """Generate structured JSON response."""
-        json_prompt = f"""{prompt}
-
-IMPORTANT: Respond ONLY with valid JSON matching this schema:
-{json.dumps(schema, indent=2)}
-
-Do not include any text outside the JSON object. No markdown formatting."""
-        
-        enhanced_system = system_prompt or ""
-        enhanced_system += "\nYou are a precise data extraction assistant. Always respond with valid JSON only, no markdown code blocks."
+        """
+        Generate structured JSON response.
         
+        Static instructions (caller system prompt, then the schema) go in the
+        system message ahead of the per-call prompt, keeping the prefix stable
+        across calls for provider-side prompt caching. The schema is also
+        enforced by Gemini's JSON output mode, so the response always parses.
+        """
         response = await self.generate(
-            prompt=json_prompt,
-            system_prompt=enhanced_system,
+            prompt=prompt,
+            system_prompt=self._structured_system(schema, system_prompt),
             temperature=0.3,
+            response_mime_type="application/json",
+            response_json_schema=schema,
         )
         
         if response.success:
             try:
-                content = response.content.strip()
-                # Clean up any markdown formatting
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.startswith("```"):
-                    content = content[3:]
-                if content.endswith("```"):
-                    content = content[:-3]
-                
-                json.loads(content.strip())
-                response.content = content.strip()
-            except json.JSONDecodeError as e:
+                response.parsed = orjson.loads(response.content)
+            except orjson.JSONDecodeError as e:
                 response.error = f"Invalid JSON response: {e}"
         
         return response
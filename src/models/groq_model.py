@@ -6,13 +6,16 @@ Primary model for fact extraction and initial analysis.
 """
 
 import time
-import json
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
+import httpx
+import orjson
 from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from .base_model import BaseModel, ModelResponse, ModelType
+from .json_stream import JsonArrayStream
+from .rate_limiter import RateLimiter
 
 
 class GroqModel(BaseModel):
@@ -22,12 +25,21 @@ class GroqModel(BaseModel):
         self,
         api_key: str,
         model_name: str = "llama-3.3-70b-versatile",
+        http_async_client: Optional[httpx.AsyncClient] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         super().__init__(api_key, model_name, ModelType.GROQ)
         self.client = ChatGroq(
             api_key=api_key,
             model=model_name,
+            http_async_client=http_async_client,
         )
+        
+        # Request quota, shared with other models on the same API key
+        self.rate_limiter = rate_limiter
+        
+        # Rendered structured-output system messages, per schema and system prompt
+        self._structured_systems: dict[tuple, tuple[dict[str, Any], str]] = {}
     
     async def generate(
         self,
@@ -35,9 +47,10 @@ class GroqModel(BaseModel):
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        **kwargs: Any,
     ) -> ModelResponse:
-        """Generate text response using Groq."""
-        start_time = time.time()
+        """Generate text response using Groq. Extra kwargs are passed to the API call."""
+        start_ns = time.perf_counter_ns()
         
         try:
             messages = []
@@ -45,13 +58,15 @@ class GroqModel(BaseModel):
                 messages.append(SystemMessage(content=system_prompt))
             messages.append(HumanMessage(content=prompt))
             
-            # Update client settings
-            self.client.temperature = temperature
-            self.client.max_tokens = max_tokens
+            # Per-call settings, so concurrent calls don't race on the shared client
+            kwargs.update(temperature=temperature, max_tokens=max_tokens)
             
-            response = await self.client.ainvoke(messages)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
             
-            latency_ms = (time.time() - start_time) * 1000
+            response = await self.client.ainvoke(messages, **kwargs)
+            
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             
             return ModelResponse(
                 content=response.content,
@@ -61,55 +76,112 @@ class GroqModel(BaseModel):
                 tokens_used=response.response_metadata.get("token_usage", {}).get("total_tokens", 0),
                 raw_response=response,
             )
-            
+        
         except Exception as e:
             return ModelResponse(
                 content="",
                 model_type=self.model_type,
                 model_name=self.model_name,
                 error=str(e),
-                latency_ms=(time.time() - start_time) * 1000,
+                latency_ms=(time.perf_counter_ns() - start_ns) / 1_000_000,
             )
     
-    async def generate_structured(
+    def _structured_system(
         self,
-        prompt: str,
         schema: dict[str, Any],
-        system_prompt: Optional[str] = None,
-    ) -> ModelResponse:
-        """Generate structured JSON response."""
-        # Enhance prompt with JSON instructions
-        json_prompt = f"""{prompt}
+        system_prompt: Optional[str],
+        json_mode: bool = False,
+    ) -> str:
+        """
+        Build the system message for structured output.
+        
+        Static instructions (caller system prompt, then the schema) go in the
+        system message ahead of the per-call prompt, keeping the prefix stable
+        across calls for provider-side prompt caching. Agents pass the same
+        schema objects every call, so each message is rendered only once.
+        In JSON mode, array schemas are described wrapped in {"items": [...]}.
+        """
+        key = (id(schema), system_prompt, json_mode)
+        cached = self._structured_systems.get(key)
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        
+        described = schema
+        if json_mode and schema.get("type") == "array":
+            described = {"type": "object", "properties": {"items": schema}, "required": ["items"]}
+        
+        enhanced_system = system_prompt or ""
+        enhanced_system += f"""
 
 IMPORTANT: Respond ONLY with valid JSON matching this schema:
-{json.dumps(schema, indent=2)}
+{orjson.dumps(described, option=orjson.OPT_INDENT_2).decode()}
 
 Do not include any text outside the JSON object."""
-        
-        enhanced_system = system_prompt or ""
         enhanced_system += "\nYou are a precise data extraction assistant. Always respond with valid JSON only."
         
+        # Holding the schema keeps its id from being reused while cached
+        if len(self._structured_systems) >= 64:
+            self._structured_systems.clear()
+        self._structured_systems[key] = (schema, enhanced_system)
+        return enhanced_system
+    
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: dict[str, Any],
+        system_prompt: Optional[str] = None,
+    ) -> ModelResponse:
+        """
+        Generate structured JSON response.
+        
+        Uses Groq's JSON mode so the API only returns syntactically valid
+        JSON. JSON mode requires a top-level object, so array schemas are
+        wrapped in {"items": [...]} for the request and unwrapped again here.
+        """
+        wrapped = schema.get("type") == "array"
+        
         response = await self.generate(
-            prompt=json_prompt,
-            system_prompt=enhanced_system,
+            prompt=prompt,
+            system_prompt=self._structured_system(schema, system_prompt, json_mode=True),
             temperature=0.3,  # Lower temp for structured output
+            response_format={"type": "json_object"},
         )
         
-        # Try to parse and validate JSON
         if response.success:
             try:
-                # Extract JSON from response
-                content = response.content.strip()
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.startswith("```"):
-                    content = content[3:]
-                if content.endswith("```"):
-                    content = content[:-3]
-                
-                json.loads(content.strip())  # Validate JSON
-                response.content = content.strip()
-            except json.JSONDecodeError as e:
+                data = orjson.loads(response.content)
+                if wrapped:
+                    data = data.get("items") if isinstance(data, dict) else None
+                if wrapped and not isinstance(data, list):
+                    # Any other shape fails, so the fallback model answers and
+                    # nothing is cached for the prompt
+                    response.error = 'Invalid JSON response: expected an "items" array'
+                else:
+                    response.content = orjson.dumps(data).decode()
+                    response.parsed = data
+            except orjson.JSONDecodeError as e:
                 response.error = f"Invalid JSON response: {e}"
         
         return response
+    
+    async def stream_structured(
+        self,
+        prompt: str,
+        schema: dict[str, Any],
+        system_prompt: Optional[str] = None,
+    ) -> AsyncIterator[Any]:
+        """Stream a structured JSON array response, yielding items as they complete."""
+        messages = [
+            SystemMessage(content=self._structured_system(schema, system_prompt)),
+            HumanMessage(content=prompt),
+        ]
+        
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        
+        parser = JsonArrayStream()
+        # Lower temp for structured output
+        async for chunk in self.client.astream(messages, temperature=0.3, max_tokens=4096):
+            for item in parser.feed(chunk.content):
+                yield item
+        parser.close()
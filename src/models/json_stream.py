@@ -0,0 +1,97 @@
+"""
+Incremental JSON Array Parsing
+
+Parses the items of a streamed JSON array response as soon as each one is
+complete, without waiting for the rest of the document.
+"""
+
+from typing import Any
+
+import orjson
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a JSON array of objects arriving in chunks.
+    
+    Text before the opening bracket (e.g. a markdown code fence) is skipped.
+    Each object or array element at the top level of the array is decoded
+    and returned by ``feed`` as soon as its closing bracket arrives.
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0  # Next unscanned character in the buffer
+        self._depth = 0  # 0 = before the array, 1 = inside it
+        self._item_start = -1
+        self._in_string = False
+        self._escaped = False
+        self.done = False
+    
+    def feed(self, text: str) -> list[Any]:
+        """
+        Add a chunk of text.
+        
+        Returns:
+            Items completed by this chunk, in order
+        
+        Raises:
+            ValueError: If a completed item is not valid JSON
+        """
+        if self.done or not text:
+            return []
+        
+        self._buffer += text
+        items = []
+        buffer = self._buffer
+        
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            
+            if self._depth == 0:
+                if char == "[":
+                    self._depth = 1
+                continue
+            
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 1:
+                    self._item_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    items.append(orjson.loads(buffer[self._item_start:i + 1]))
+                    self._item_start = -1
+                elif self._depth == 0:
+                    self.done = True
+                    break
+        
+        # Keep only the unfinished item (if any) buffered
+        keep_from = self._item_start if self._item_start >= 0 else len(buffer)
+        self._buffer = buffer[keep_from:]
+        self._pos = len(buffer) - keep_from
+        if self._item_start >= 0:
+            self._item_start = 0
+        
+        return items
+    
+    def close(self) -> None:
+        """
+        Finish parsing.
+        
+        Raises:
+            ValueError: If the stream did not contain a complete JSON array
+        """
+        if not self.done:
+            raise ValueError("Incomplete JSON array in response")
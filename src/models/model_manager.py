@@ -5,11 +5,24 @@ Manages multiple AI models with intelligent routing and fallback.
 """
 
 import asyncio
-from typing import Any, Optional
+from dataclasses import replace
+from typing import Any, AsyncIterator, Coroutine, Optional
 from enum import Enum
 
+import httpx
+import orjson
+from groq import APIError as GroqAPIError
+from langchain_google_genai.chat_models import ChatGoogleGenerativeAIError
+
 from .base_model import BaseModel, ModelResponse, ModelType
 from .groq_model import GroqModel
+from .prompt_cache import ResponseCache, SemanticPromptCache
+from .rate_limiter import RateLimiter
+
+
+# Errors a structured stream can fail with: unparseable output, and transport
+# or API errors from either provider
+STREAM_ERRORS = (ValueError, httpx.HTTPError, GroqAPIError, ChatGoogleGenerativeAIError)
 
 
 class TaskType(Enum):
@@ -36,27 +49,95 @@ class ModelManager:
         groq_model: str = "llama-3.3-70b-versatile",
         groq_fast_model: str = "llama-3.1-8b-instant",
         gemini_model: str = "",  # Not used
+        max_concurrency: int = 4,
+        semantic_cache: Optional[SemanticPromptCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        hedge_delay_ms: int = 0,
+        groq_rpm: int = 30,
     ):
+        # Pooled HTTP client shared by both models, so concurrent agent
+        # calls reuse keep-alive connections instead of opening new ones
+        self.http_client = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        
+        # Both models use the same API key, so they share one request quota
+        # (0 disables the limit)
+        self.rate_limiter = RateLimiter(groq_rpm) if groq_rpm else None
+        
         # Primary model for complex reasoning
-        self.groq = GroqModel(groq_api_key, groq_model)
+        self.groq = GroqModel(groq_api_key, groq_model, self.http_client, self.rate_limiter)
         # Fast model for extraction tasks
-        self.groq_fast = GroqModel(groq_api_key, groq_fast_model)
+        self.groq_fast = GroqModel(groq_api_key, groq_fast_model, self.http_client, self.rate_limiter)
         
         # Alias for backward compatibility
         self.gemini = self.groq  # Use Groq as fallback too
         
+        # (primary, fallback) per task type: the large model for complex
+        # reasoning, the fast model for speed otherwise
+        self._routes = {
+            TaskType.COMPLEX_REASONING: (self.groq, self.groq_fast),
+            TaskType.FAST_EXTRACTION: (self.groq_fast, self.groq),
+            TaskType.STRUCTURED_OUTPUT: (self.groq_fast, self.groq),
+        }
+        
+        # Per-model cap on in-flight requests, so agents running concurrently
+        # don't push a model past its rate limit
+        self._limits = {
+            self.groq: asyncio.Semaphore(max_concurrency),
+            self.groq_fast: asyncio.Semaphore(max_concurrency),
+        }
+        
+        # Responses for near-identical prompts, used by callers that pass a
+        # cache_namespace
+        self.semantic_cache = semantic_cache
+        # Structured responses for byte-identical requests, used for every
+        # structured call (they run at a fixed low temperature)
+        self.response_cache = response_cache
+        
+        # generate() starts the fallback model if the primary has not answered
+        # within this delay (0, the default, disables hedging). Off until a
+        # caller needs it: a delay shorter than a normal completion would send
+        # most calls to both models
+        self.hedge_delay_ms = hedge_delay_ms
+        
         # Track rate limiting
         self._groq_rate_limited = False
         self._rate_limit_reset_time = 0
     
     def _get_model_for_task(self, task_type: TaskType) -> tuple[BaseModel, BaseModel]:
         """Get primary and fallback model for task type."""
-        if task_type == TaskType.COMPLEX_REASONING:
-            # Use large model, fallback to fast
-            return self.groq, self.groq_fast
-        else:
-            # Use fast model for speed, fallback to large
-            return self.groq_fast, self.groq
+        return self._routes[task_type]
+    
+    def _cached_response(
+        self,
+        cache_namespace: Optional[str],
+        task_type: TaskType,
+        prompt: str,
+    ) -> Optional[ModelResponse]:
+        """Look up a response for a near-identical prompt in the caller's namespace."""
+        if cache_namespace is None or self.semantic_cache is None:
+            return None
+        
+        cached = self.semantic_cache.get(f"{cache_namespace}:{task_type.name}", prompt)
+        if cached is None:
+            return None
+        # A copy, so callers can't alter the cached entry
+        return replace(cached, latency_ms=0.0, raw_response=None)
+    
+    def _cache_response(
+        self,
+        cache_namespace: Optional[str],
+        task_type: TaskType,
+        prompt: str,
+        response: ModelResponse,
+    ) -> None:
+        """Remember a successful response in the caller's namespace."""
+        if cache_namespace is None or self.semantic_cache is None or not response.success:
+            return
+        
+        self.semantic_cache.put(f"{cache_namespace}:{task_type.name}", prompt, response)
     
     async def generate(
         self,
@@ -65,36 +146,90 @@ class ModelManager:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        cache_namespace: Optional[str] = None,
     ) -> ModelResponse:
         """
         Generate response with automatic model selection and fallback.
+        
+        When cache_namespace is given, a cached response for a near-identical
+        prompt in that namespace is returned without calling a model.
         """
+        cached = self._cached_response(cache_namespace, task_type, prompt)
+        if cached is not None:
+            return cached
+        
         primary, fallback = self._get_model_for_task(task_type)
         
-        # Try primary model
-        response = await primary.generate(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        async def run(model: BaseModel) -> ModelResponse:
+            async with self._limits[model]:
+                return await model.generate(
+                    prompt=prompt,
+                    system_prompt=system_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
         
-        if response.success:
-            return response
+        # Hedging sends some prompts to both models, so not while rate limited
+        if not self.hedge_delay_ms or self._groq_rate_limited:
+            response = await run(primary)
+            if not response.success:
+                self._check_rate_limit(response)
+                # Try fallback model
+                response = await run(fallback)
+        else:
+            response = await self._hedge_generate(run(primary), run(fallback))
         
-        # Check if rate limited
-        if "rate" in response.error.lower():
-            self._groq_rate_limited = True
+        self._cache_response(cache_namespace, task_type, prompt, response)
+        return response
+    
+    async def _hedge_generate(
+        self,
+        primary_call: Coroutine[Any, Any, ModelResponse],
+        fallback_call: Coroutine[Any, Any, ModelResponse],
+    ) -> ModelResponse:
+        """
+        Run the primary call, starting the fallback if the primary has not
+        succeeded within the hedge delay.
         
-        # Try fallback model
-        fallback_response = await fallback.generate(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        Returns:
+            The first successful response, or the fallback's failed response
+        """
+        primary_task = asyncio.create_task(primary_call)
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.hedge_delay_ms / 1000)
+        except asyncio.CancelledError:
+            primary_task.cancel()
+            fallback_call.close()
+            raise
+        
+        if done:
+            response = primary_task.result()
+            if response.success:
+                fallback_call.close()
+                return response
+            self._check_rate_limit(response)
+        
+        fallback_task = asyncio.create_task(fallback_call)
+        pending = {primary_task, fallback_task} - done
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary if both finished together
+                for task in (primary_task, fallback_task):
+                    if task in done and task.result().success:
+                        return task.result()
+                if primary_task in done:
+                    self._check_rate_limit(primary_task.result())
+        finally:
+            for task in pending:
+                task.cancel()
         
-        return fallback_response
+        return fallback_task.result()
+    
+    def _check_rate_limit(self, response: ModelResponse) -> None:
+        """Note a rate-limit error from a failed response."""
+        if "rate" in response.error.lower():
+            self._groq_rate_limited = True
     
     async def generate_structured(
         self,
@@ -102,39 +237,163 @@ class ModelManager:
         schema: dict[str, Any],
         task_type: TaskType = TaskType.STRUCTURED_OUTPUT,
         system_prompt: Optional[str] = None,
+        cache_namespace: Optional[str] = None,
     ) -> ModelResponse:
-        """Generate structured JSON with fallback."""
+        """
+        Generate structured JSON with fallback.
+        
+        Identical requests are answered from the response cache, checked
+        first since it is a hash lookup; with a cache_namespace, so are
+        near-identical prompts.
+        """
+        if self.response_cache is not None:
+            key = ResponseCache.make_key(prompt, schema, task_type, system_prompt)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return replace(cached, latency_ms=0.0, raw_response=None)
+        
+        cached = self._cached_response(cache_namespace, task_type, prompt)
+        if cached is not None:
+            return cached
+        
         primary, fallback = self._get_model_for_task(task_type)
         
-        response = await primary.generate_structured(
-            prompt=prompt,
-            schema=schema,
-            system_prompt=system_prompt,
-        )
+        async with self._limits[primary]:
+            response = await primary.generate_structured(
+                prompt=prompt,
+                schema=schema,
+                system_prompt=system_prompt,
+            )
+        
+        if not response.success:
+            # Try fallback
+            async with self._limits[fallback]:
+                response = await fallback.generate_structured(
+                    prompt=prompt,
+                    schema=schema,
+                    system_prompt=system_prompt,
+                )
+        
+        # Structured responses are only successful once their JSON has parsed
+        if self.response_cache is not None and response.success:
+            self.response_cache.put(key, response)
+        self._cache_response(cache_namespace, task_type, prompt, response)
+        return response
+    
+    async def stream_structured(
+        self,
+        prompt: str,
+        schema: dict[str, Any],
+        task_type: TaskType = TaskType.STRUCTURED_OUTPUT,
+        system_prompt: Optional[str] = None,
+        cache_namespace: Optional[str] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Stream the items of a structured JSON array response with fallback.
+        
+        Falls back to the other model only if the primary fails before
+        producing any item; a failure mid-stream is raised to the caller.
+        Cached responses are replayed item by item, looked up as in
+        generate_structured; only streams that completed are cached.
+        
+        Raises:
+            One of STREAM_ERRORS: If both models fail, or the stream fails part-way
+        """
+        if self.response_cache is not None:
+            key = ResponseCache.make_key(prompt, schema, task_type, system_prompt)
+            cached = self.response_cache.get(key)
+        else:
+            cached = None
+        if cached is None:
+            cached = self._cached_response(cache_namespace, task_type, prompt)
         
-        if response.success:
-            return response
+        if cached is not None:
+            for item in orjson.loads(cached.content):
+                yield item
+            return
         
-        # Try fallback
-        return await fallback.generate_structured(
-            prompt=prompt,
-            schema=schema,
-            system_prompt=system_prompt,
+        primary, fallback = self._get_model_for_task(task_type)
+        
+        items = []
+        model = primary
+        try:
+            async with self._limits[primary]:
+                async for item in primary.stream_structured(prompt, schema, system_prompt):
+                    items.append(item)
+                    yield item
+        except STREAM_ERRORS:
+            if items:
+                raise
+            
+            # Try fallback
+            model = fallback
+            async with self._limits[fallback]:
+                async for item in fallback.stream_structured(prompt, schema, system_prompt):
+                    items.append(item)
+                    yield item
+        
+        # Recorded as answered by the model that produced the stream
+        response = ModelResponse(
+            content=orjson.dumps(items).decode(),
+            model_type=model.model_type,
+            model_name=model.model_name,
         )
+        if self.response_cache is not None:
+            self.response_cache.put(key, response)
+        self._cache_response(cache_namespace, task_type, prompt, response)
     
     async def parallel_generate(
         self,
         prompts: list[str],
         task_type: TaskType = TaskType.FAST_EXTRACTION,
         system_prompt: Optional[str] = None,
+        max_concurrency: int = 8,
     ) -> list[ModelResponse]:
-        """Generate multiple prompts in parallel."""
-        tasks = [
-            self.generate(
-                prompt=prompt,
-                task_type=task_type,
-                system_prompt=system_prompt,
-            )
-            for prompt in prompts
-        ]
-        return await asyncio.gather(*tasks)
+        """Generate multiple prompts in parallel, with at most max_concurrency in flight."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate_one(prompt: str) -> ModelResponse:
+            async with semaphore:
+                return await self.generate(
+                    prompt=prompt,
+                    task_type=task_type,
+                    system_prompt=system_prompt,
+                )
+        
+        return await asyncio.gather(*(generate_one(prompt) for prompt in prompts))
+    
+    async def parallel_generate_iter(
+        self,
+        prompts: list[str],
+        task_type: TaskType = TaskType.FAST_EXTRACTION,
+        system_prompt: Optional[str] = None,
+        max_concurrency: int = 8,
+    ) -> AsyncIterator[tuple[int, ModelResponse]]:
+        """
+        Generate multiple prompts in parallel, yielding responses as they finish.
+        
+        Yields:
+            (index of the prompt, response) pairs, in completion order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def generate_one(index: int, prompt: str) -> tuple[int, ModelResponse]:
+            async with semaphore:
+                return index, await self.generate(
+                    prompt=prompt,
+                    task_type=task_type,
+                    system_prompt=system_prompt,
+                )
+        
+        tasks = [asyncio.create_task(generate_one(i, prompt)) for i, prompt in enumerate(prompts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The caller may stop early; don't leave calls running
+            for task in tasks:
+                task.cancel()
+    
+    async def close(self):
+        """Close the shared HTTP client."""
+        await self.http_client.aclose()
@@ -0,0 +1,304 @@
+"""
+Prompt Caches
+
+Reuses LLM responses for prompts that repeat exactly or are near-duplicates
+of earlier ones.
+"""
+
+import hashlib
+import re
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict, deque
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import orjson
+
+from .base_model import ModelResponse, ModelType
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class SemanticPromptCache:
+    """
+    In-process cache of LLM responses keyed by prompt similarity.
+    
+    Prompts are embedded as L2-normalized hashed bag-of-words vectors
+    (unigrams and bigrams), so lookups are a single matrix-vector product
+    against the cached entries of a namespace. Namespaces keep different
+    task types (e.g. fact extraction vs connection mapping) from colliding.
+    When a path is given, entries are also written to SQLite and the most
+    recent ones are loaded back on startup.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        dimensions: int = 2048,
+        max_entries: int = 256,
+        path: Optional[Path] = None,
+    ):
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self.max_entries = max_entries
+        
+        # namespace -> (embeddings, responses), oldest first
+        self._entries: dict[str, tuple[deque, deque]] = {}
+        
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS prompts ("
+                "namespace TEXT, embedding BLOB, content TEXT, model_type TEXT, model_name TEXT)"
+            )
+            self._load()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def _load(self) -> None:
+        """Load the newest stored entries of each namespace, dropping older ones."""
+        self._db.execute(
+            "DELETE FROM prompts WHERE rowid IN ("
+            "SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER "
+            "(PARTITION BY namespace ORDER BY rowid DESC) AS age FROM prompts) WHERE age > ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+        
+        rows = self._db.execute(
+            "SELECT namespace, embedding, content, model_type, model_name FROM prompts ORDER BY rowid"
+        )
+        for namespace, embedding, content, model_type, model_name in rows:
+            # Embeddings from a different dimensions setting can't be compared
+            if len(embedding) != self.dimensions * 4:
+                continue
+            embeddings, responses = self._namespace(namespace)
+            embeddings.append(np.frombuffer(embedding, dtype=np.float32))
+            responses.append(ModelResponse(
+                content=content,
+                model_type=ModelType(model_type),
+                model_name=model_name,
+            ))
+    
+    def _namespace(self, namespace: str) -> tuple[deque, deque]:
+        """Get the (embeddings, responses) deques of a namespace."""
+        return self._entries.setdefault(
+            namespace,
+            (deque(maxlen=self.max_entries), deque(maxlen=self.max_entries)),
+        )
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Embed text as a normalized hashed unigram + bigram count vector."""
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        
+        vector = np.bincount(
+            np.fromiter(
+                (zlib.crc32(f.encode()) % self.dimensions for f in features),
+                dtype=np.int64,
+                count=len(features),
+            ),
+            minlength=self.dimensions,
+        ).astype(np.float32)
+        
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def get(self, namespace: str, prompt: str) -> Optional[ModelResponse]:
+        """
+        Look up a response for a similar prompt.
+        
+        Returns:
+            Cached ModelResponse if the best match reaches the threshold
+        """
+        entries = self._entries.get(namespace)
+        if not entries or not entries[0]:
+            self.misses += 1
+            return None
+        
+        embeddings, responses = entries
+        similarities = np.stack(embeddings) @ self.embed(prompt)
+        best = int(np.argmax(similarities))
+        
+        if similarities[best] >= self.threshold:
+            self.hits += 1
+            return responses[best]
+        
+        self.misses += 1
+        return None
+    
+    def put(self, namespace: str, prompt: str, response: ModelResponse) -> None:
+        """Store a successful response for a prompt."""
+        embedding = self.embed(prompt)
+        embeddings, responses = self._namespace(namespace)
+        embeddings.append(embedding)
+        responses.append(response)
+        
+        if self._db is not None:
+            self._db.execute(
+                "INSERT INTO prompts VALUES (?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    embedding.tobytes(),
+                    response.content,
+                    response.model_type.value,
+                    response.model_name,
+                ),
+            )
+            self._db.commit()
+    
+    def clear(self) -> None:
+        """Drop all cached entries, including stored ones."""
+        self._entries.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM prompts")
+            self._db.commit()
+    
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class ResponseCache:
+    """
+    Exact-match cache of structured LLM responses.
+    
+    Entries are keyed on a hash of prompt, schema and task type, held in an
+    in-memory LRU and, when a path is given, mirrored to SQLite so they
+    survive across runs. Stored entries expire after ttl seconds, and only
+    the newest max_stored_entries are kept.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: int = 1024,
+        max_stored_entries: int = 10_000,
+        ttl: float = 7 * 24 * 60 * 60,
+    ):
+        self.max_entries = max_entries
+        self.max_stored_entries = max_stored_entries
+        self.ttl = ttl
+        self._memory: OrderedDict[str, ModelResponse] = OrderedDict()
+        
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Agents may run on a different thread than the one that built the cache
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, content TEXT, model_type TEXT, model_name TEXT, "
+                "created_at REAL NOT NULL DEFAULT 0)"
+            )
+            # Tables from before created_at existed; their rows count as expired
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+            if "created_at" not in columns:
+                self._db.execute(
+                    "ALTER TABLE responses ADD COLUMN created_at REAL NOT NULL DEFAULT 0"
+                )
+            self._prune()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def _prune(self) -> None:
+        """Drop stored entries that have expired or are beyond the newest max_stored_entries."""
+        self._db.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (time.time() - self.ttl,),
+        )
+        self._db.execute(
+            "DELETE FROM responses WHERE rowid IN ("
+            "SELECT rowid FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_stored_entries,),
+        )
+        self._db.commit()
+    
+    # Serialized schemas by object id, with the schema held so the id stays valid
+    _schema_bytes: dict[int, tuple[dict[str, Any], bytes]] = {}
+    
+    @classmethod
+    def make_key(
+        cls,
+        prompt: str,
+        schema: dict[str, Any],
+        task_type: Enum,
+        system_prompt: Optional[str] = None,
+    ) -> str:
+        """Hash a structured request into a cache key."""
+        cached = cls._schema_bytes.get(id(schema))
+        if cached is None or cached[0] is not schema:
+            if len(cls._schema_bytes) >= 64:  # Callers building schemas per call
+                cls._schema_bytes.clear()
+            cached = (schema, orjson.dumps(schema, option=orjson.OPT_SORT_KEYS))
+            cls._schema_bytes[id(schema)] = cached
+        
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update((system_prompt or "").encode())
+        digest.update(b"\0")
+        digest.update(prompt.encode())
+        digest.update(cached[1])
+        digest.update(task_type.name.encode())
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[ModelResponse]:
+        """Look up a cached response by key."""
+        response = self._memory.get(key)
+        if response is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return response
+        
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT content, model_type, model_name FROM responses "
+                "WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+            if row is not None:
+                response = ModelResponse(
+                    content=row[0],
+                    model_type=ModelType(row[1]),
+                    model_name=row[2],
+                )
+                self._remember(key, response)
+                self.hits += 1
+                return response
+        
+        self.misses += 1
+        return None
+    
+    def put(self, key: str, response: ModelResponse) -> None:
+        """Store a successful response."""
+        self._remember(key, response)
+        
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, response.content, response.model_type.value, response.model_name, time.time()),
+            )
+            self._db.commit()
+    
+    def _remember(self, key: str, response: ModelResponse) -> None:
+        """Add to the in-memory LRU, evicting the oldest entry when full."""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,44 @@
+"""
+Request Rate Limiting
+
+Token bucket that spaces out API requests to stay under a requests-per-period
+quota.
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Async token bucket allowing max_rate requests per time_period seconds.
+    
+    Up to max_rate requests may start at once; after that, requests are let
+    through as tokens refill, in the order they arrived.
+    """
+    
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        
+        self._tokens = max_rate
+        self._refill_per_second = max_rate / time_period
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.max_rate,
+                    self._tokens + (now - self._updated) * self._refill_per_second,
+                )
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) / self._refill_per_second)
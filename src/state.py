@@ -4,10 +4,11 @@ LangGraph State Management
 Defines the state schema for the research agent workflow.
 """
 
+import hashlib
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Annotated, Any, Optional
+from typing import Annotated, Any, Callable, Hashable, Optional
 import operator
 
 
@@ -16,13 +17,19 @@ class InvestigationPhase(Enum):
     INITIAL_SEARCH = "initial_search"
     FACT_EXTRACTION = "fact_extraction"
     RISK_ANALYSIS = "risk_analysis"
-    CONNECTION_MAPPING = "connection_mapping"
     SOURCE_VALIDATION = "source_validation"
     REPORT_GENERATION = "report_generation"
     COMPLETE = "complete"
 
 
-@dataclass
+# Phases after which no more searching happens
+TERMINAL_PHASES = frozenset({
+    InvestigationPhase.REPORT_GENERATION,
+    InvestigationPhase.COMPLETE,
+})
+
+
+@dataclass(slots=True)
 class SearchResult:
     """Individual search result."""
     query: str
@@ -31,9 +38,17 @@ class SearchResult:
     url: str
     timestamp: datetime = field(default_factory=datetime.now)
     relevance_score: float = 0.0
+    _snippet_lower: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def snippet_lower(self) -> str:
+        """Stripped, lowercased snippet, computed once per result."""
+        if self._snippet_lower is None:
+            self._snippet_lower = self.snippet.strip().lower()
+        return self._snippet_lower
 
 
-@dataclass
+@dataclass(slots=True)
 class Finding:
     """Extracted finding about the target."""
     category: str  # biography, professional, financial, etc.
@@ -55,7 +70,7 @@ class Finding:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class RiskIndicator:
     """Identified risk pattern or red flag."""
     category: str  # legal, financial, reputation, association
@@ -77,7 +92,7 @@ class RiskIndicator:
         }
 
 
-@dataclass 
+@dataclass(slots=True)
 class Connection:
     """Relationship between entities."""
     entity_name: str
@@ -99,6 +114,21 @@ class Connection:
         }
 
 
+def finding_key(finding: Finding) -> str:
+    """Findings with the same fact, ignoring case and spacing, are duplicates."""
+    return " ".join(finding.fact.lower().split())
+
+
+def risk_key(risk: RiskIndicator) -> str:
+    """Risks with the same description, ignoring case, are duplicates."""
+    return risk.description.lower()
+
+
+def connection_key(connection: Connection) -> tuple[str, str]:
+    """Connections to the same entity, ignoring case, with the same relationship are duplicates."""
+    return connection.entity_name.lower(), connection.relationship
+
+
 @dataclass
 class AgentState:
     """
@@ -136,46 +166,96 @@ class AgentState:
         return (
             self.iteration_count < self.max_iterations
             and len(self.pending_queries) > 0
-            and self.current_phase not in [
-                InvestigationPhase.REPORT_GENERATION,
-                InvestigationPhase.COMPLETE,
-            ]
+            and self.current_phase not in TERMINAL_PHASES
         )
     
+    def _dedup_index(
+        self,
+        items: list,
+        key: Callable[[Any], Hashable],
+    ) -> dict[Hashable, Any]:
+        """
+        Map each item's dedup key to the first item with that key.
+        
+        The index isn't a dataclass field, so LangGraph never sees it and each
+        node's state builds its own on first use. It is rebuilt when the list
+        is replaced or its length changes other than through the add_* methods.
+        """
+        indexes = self.__dict__.setdefault("_dedup_indexes", {})
+        cached = indexes.get(key)
+        if cached is None or cached[0] is not items or cached[1] != len(items):
+            index: dict[Hashable, Any] = {}
+            for item in items:
+                index.setdefault(key(item), item)
+            cached = indexes[key] = [items, len(items), index]
+        return cached
+    
+    def _add_unique(self, items: list, key: Callable[[Any], Hashable], item: Any) -> Any:
+        """Append item unless one with the same key exists; return the kept item."""
+        cached = self._dedup_index(items, key)
+        existing = cached[2].setdefault(key(item), item)
+        if existing is item:
+            items.append(item)
+            cached[1] += 1
+        return existing
+    
     def add_finding(self, finding: Finding) -> None:
         """Add a new finding, avoiding duplicates."""
         # Check for duplicate facts
-        for existing in self.findings:
-            if existing.fact.lower() == finding.fact.lower():
-                # Update confidence if higher
-                if finding.confidence > existing.confidence:
-                    existing.confidence = finding.confidence
-                    existing.source_urls.extend(finding.source_urls)
-                return
-        self.findings.append(finding)
+        existing = self._add_unique(self.findings, finding_key, finding)
+        if existing is not finding:
+            # Update confidence if higher
+            if finding.confidence > existing.confidence:
+                existing.confidence = finding.confidence
+                # Merge sources without repeating ones already cited
+                known = set(existing.source_urls)
+                existing.source_urls.extend(
+                    url for url in dict.fromkeys(finding.source_urls) if url not in known
+                )
     
     def add_risk(self, risk: RiskIndicator) -> None:
         """Add a risk indicator."""
         # Check for similar risks
-        for existing in self.risk_indicators:
-            if existing.description.lower() == risk.description.lower():
-                if risk.confidence > existing.confidence:
-                    existing.confidence = risk.confidence
-                return
-        self.risk_indicators.append(risk)
+        existing = self._add_unique(self.risk_indicators, risk_key, risk)
+        if existing is not risk and risk.confidence > existing.confidence:
+            existing.confidence = risk.confidence
     
     def add_connection(self, connection: Connection) -> None:
         """Add a connection."""
-        for existing in self.connections:
-            if (existing.entity_name.lower() == connection.entity_name.lower() 
-                and existing.relationship == connection.relationship):
-                return
-        self.connections.append(connection)
+        self._add_unique(self.connections, connection_key, connection)
     
     def get_high_confidence_findings(self, min_confidence: float = 0.7) -> list[Finding]:
         """Get findings above confidence threshold."""
         return [f for f in self.findings if f.confidence >= min_confidence]
     
+    def get_recent_search_results(self, limit: int) -> list[SearchResult]:
+        """
+        Get the most recent search results without repeats.
+        
+        Results whose URL or snippet already appeared earlier in the window
+        are skipped, so re-queried pages aren't sent to the LLM twice.
+        """
+        seen_urls = set()
+        seen_snippets = set()
+        unique = []
+        
+        for result in self.search_results[-limit:]:
+            if result.url in seen_urls:
+                continue
+            
+            if result.snippet:
+                snippet_hash = hashlib.blake2b(
+                    result.snippet_lower.encode(), digest_size=8
+                ).digest()
+                if snippet_hash in seen_snippets:
+                    continue
+                seen_snippets.add(snippet_hash)
+            
+            seen_urls.add(result.url)
+            unique.append(result)
+        
+        return unique
+    
     def get_critical_risks(self, min_severity: int = 7) -> list[RiskIndicator]:
         """Get high severity risks."""
         return [r for r in self.risk_indicators if r.severity >= min_severity]
@@ -186,9 +266,40 @@ class AgentState:
             "target_name": self.target_name,
             "target_context": self.target_context,
             "search_history": self.search_history,
-            "findings": [f.to_dict() for f in self.findings],
-            "risk_indicators": [r.to_dict() for r in self.risk_indicators],
-            "connections": [c.to_dict() for c in self.connections],
+            # Inlined to_dict() of each item, saving a method call per item
+            "findings": [
+                {
+                    "category": f.category,
+                    "fact": f.fact,
+                    "source_urls": f.source_urls,
+                    "confidence": f.confidence,
+                    "extracted_at": f.extracted_at.isoformat(),
+                    "verified": f.verified,
+                }
+                for f in self.findings
+            ],
+            "risk_indicators": [
+                {
+                    "category": r.category,
+                    "description": r.description,
+                    "severity": r.severity,
+                    "evidence": r.evidence,
+                    "source_urls": r.source_urls,
+                    "confidence": r.confidence,
+                }
+                for r in self.risk_indicators
+            ],
+            "connections": [
+                {
+                    "entity_name": c.entity_name,
+                    "entity_type": c.entity_type,
+                    "relationship": c.relationship,
+                    "timeframe": c.timeframe,
+                    "source_urls": c.source_urls,
+                    "confidence": c.confidence,
+                }
+                for c in self.connections
+            ],
             "current_phase": self.current_phase.value,
             "iteration_count": self.iteration_count,
             "errors": self.errors,
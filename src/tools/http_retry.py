@@ -0,0 +1,59 @@
+"""
+HTTP Retry Helpers
+
+Retries requests that a server rejected as temporarily overloaded, so a
+transient 429 or 503 doesn't lose a search or a page.
+"""
+
+import asyncio
+
+import httpx
+
+
+# Statuses worth retrying after a short wait
+RETRY_STATUSES = frozenset({429, 503})
+
+# Retries after the first attempt
+MAX_RETRIES = 3
+
+# Longest Retry-After wait honored, in seconds
+MAX_RETRY_AFTER = 10.0
+
+
+def retry_delay(response: httpx.Response, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a rejected request.
+    
+    Args:
+        response: The rejected response
+        attempt: Zero-based number of the attempt that was rejected
+    
+    Returns:
+        The server's Retry-After delay when given in seconds, else an
+        exponential backoff
+    """
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER)
+    return 0.2 * 2 ** attempt
+
+
+async def send_with_retries(
+    client: httpx.AsyncClient,
+    request: httpx.Request,
+    stream: bool = False,
+) -> httpx.Response:
+    """
+    Send a request, retrying it while the server answers 429 or 503.
+    
+    Connection failures are retried by the client's transport. The last
+    response is returned whatever its status; with stream=True the caller
+    must close it.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        response = await client.send(request, stream=stream)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        
+        await response.aclose()
+        await asyncio.sleep(retry_delay(response, attempt))
@@ -4,14 +4,66 @@ Web Scraper Tool
 Extracts content from web pages for deeper analysis.
 """
 
+import re
+
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
 from dataclasses import dataclass
-from typing import Optional
-from urllib.parse import urlparse
+from typing import Iterator, Optional
+
+from lxml import etree
+
+from ..utils.url import extract_domain
+from .http_retry import MAX_RETRIES, send_with_retries
+
+
+# Elements whose text is left out of scraped content
+SKIPPED_TAGS = frozenset({"script", "style", "nav", "footer", "header", "template"})
+
+# A line break with any whitespace and blank lines around it
+LINE_BREAK_PATTERN = re.compile(r"\s*\n\s*")
+
+
+def decode_html(data: bytes, encoding: Optional[str]) -> str | bytes:
+    """
+    Decode a page with its declared charset, falling back to UTF-8.
+    
+    Returns:
+        Decoded markup, or the raw bytes for lxml to detect the encoding
+        from the page itself when neither decodes cleanly
+    """
+    for candidate in (encoding, "utf-8"):
+        if candidate:
+            try:
+                return data.decode(candidate)
+            except (LookupError, UnicodeDecodeError):
+                pass
+    return data
+
+
+def iter_text(element: etree._Element) -> Iterator[str]:
+    """Yield the text nodes under an element in document order, skipping SKIPPED_TAGS."""
+    stack: list = [element]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+        
+        # Comments and processing instructions have no string tag
+        if not isinstance(item.tag, str) or item.tag in SKIPPED_TAGS:
+            continue
+        
+        if item.text:
+            yield item.text
+        for child in reversed(item):
+            # A skipped child's tail is still part of its parent's text
+            if child.tail:
+                stack.append(child.tail)
+            stack.append(child)
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrapedContent:
     """Content extracted from a web page."""
     url: str
@@ -45,6 +97,12 @@ class WebScraperTool:
         "linkedin.com",
     }
     
+    # Subdomain suffixes of the blocked domains, for a single endswith check
+    BLOCKED_SUFFIXES = tuple("." + d for d in BLOCKED_DOMAINS)
+    
+    # Bytes of HTML read per character of max_length, headroom for markup
+    BYTES_PER_TEXT_CHAR = 20
+    
     def __init__(self, timeout: float = 15.0):
         self.timeout = timeout
         self.client: httpx.AsyncClient | None = None
@@ -57,15 +115,19 @@ class WebScraperTool:
                 timeout=self.timeout,
                 headers={"User-Agent": self.USER_AGENT},
                 follow_redirects=True,
+                # Connection failures are retried by the transport
+                transport=httpx.AsyncHTTPTransport(
+                    retries=MAX_RETRIES,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                ),
             )
     
     def _is_blocked_domain(self, url: str) -> bool:
         """Check if domain commonly blocks scraping."""
-        try:
-            domain = urlparse(url).netloc.lower()
-            return any(blocked in domain for blocked in self.BLOCKED_DOMAINS)
-        except:
-            return False
+        domain = extract_domain(url).partition(":")[0]  # Drop any port
+        
+        # Suffix match, so unrelated domains like "netx.com" aren't blocked
+        return domain in self.BLOCKED_DOMAINS or domain.endswith(self.BLOCKED_SUFFIXES)
     
     async def scrape(self, url: str, max_length: int = 5000) -> ScrapedContent:
         """
@@ -74,7 +136,7 @@ class WebScraperTool:
         Args:
             url: URL to scrape
             max_length: Maximum text length to return
-            
+        
         Returns:
             ScrapedContent with extracted text
         """
@@ -91,39 +153,63 @@ class WebScraperTool:
             # Ensure client is available
             self._ensure_client()
             
-            response = await self.client.get(url)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, "lxml")
+            # Stream the body and stop once there is enough markup to fill
+            # max_length characters of text, so huge pages are never fully read
+            max_bytes = max_length * self.BYTES_PER_TEXT_CHAR
+            response = await send_with_retries(
+                self.client, self.client.build_request("GET", url), stream=True
+            )
+            try:
+                response.raise_for_status()
+                
+                chunks: list[bytes] = []
+                total = 0
+                async for chunk in response.aiter_bytes(65536):
+                    chunks.append(chunk)
+                    total += len(chunk)
+                    if total >= max_bytes:
+                        break
+                encoding = response.charset_encoding
+            finally:
+                await response.aclose()
             
-            # Remove script and style elements
-            for element in soup(["script", "style", "nav", "footer", "header"]):
-                element.decompose()
+            # Parse with lxml directly; its C tree is far cheaper to build
+            # and walk than BeautifulSoup's Python objects
+            try:
+                root = lxml.html.document_fromstring(decode_html(b"".join(chunks), encoding))
+            except etree.ParserError:  # Empty document
+                return ScrapedContent(url=url, title="", text="", success=True)
             
             # Get title
             title = ""
-            if soup.title:
-                title = soup.title.get_text(strip=True)
+            title_tag = root.find(".//title")
+            if title_tag is not None:
+                title = "".join(title_tag.itertext()).strip()
             
             # Get meta description
             meta_desc = ""
-            meta_tag = soup.find("meta", attrs={"name": "description"})
-            if meta_tag:
-                meta_desc = meta_tag.get("content", "")
+            meta_tags = root.xpath("//meta[@name='description']")
+            if meta_tags:
+                meta_desc = meta_tags[0].get("content", "")
             
             # Get main content
             # Try to find article or main content areas
-            main_content = soup.find("article") or soup.find("main") or soup.find("body")
+            main_content = root.find(".//article")
+            if main_content is None:
+                main_content = root.find(".//main")
+            if main_content is None:
+                main_content = root.find(".//body")
+            if main_content is None:
+                main_content = root
             
-            if main_content:
-                # Get text with some structure preserved
-                text = main_content.get_text(separator="\n", strip=True)
-            else:
-                text = soup.get_text(separator="\n", strip=True)
+            # Get text with some structure preserved, leaving out scripts,
+            # styles and page chrome
+            text = "\n".join(
+                string.strip() for string in iter_text(main_content) if string.strip()
+            )
             
-            # Clean up whitespace
-            lines = [line.strip() for line in text.split("\n") if line.strip()]
-            text = "\n".join(lines)
+            # Clean up whitespace: strip every line and drop blank ones
+            text = LINE_BREAK_PATTERN.sub("\n", text)
             
             # Truncate if too long
             if len(text) > max_length:
@@ -136,7 +222,7 @@ class WebScraperTool:
                 meta_description=meta_desc,
                 success=True,
             )
-            
+        
         except httpx.HTTPError as e:
             return ScrapedContent(
                 url=url,
@@ -158,12 +244,43 @@ class WebScraperTool:
         self,
         urls: list[str],
         max_length: int = 3000,
+        max_concurrency: int = 8,
     ) -> list[ScrapedContent]:
-        """Scrape multiple URLs in parallel."""
+        """
+        Scrape multiple URLs in parallel.
+        
+        Args:
+            urls: URLs to scrape
+            max_length: Maximum text length per page
+            max_concurrency: Maximum number of pages fetched at once
+        
+        Returns:
+            ScrapedContent for each URL, in input order
+        """
         import asyncio
         
-        tasks = [self.scrape(url, max_length) for url in urls]
-        return await asyncio.gather(*tasks)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def scrape_one(url: str) -> ScrapedContent:
+            async with semaphore:
+                return await self.scrape(url, max_length)
+        
+        results = await asyncio.gather(
+            *(scrape_one(url) for url in urls),
+            return_exceptions=True,
+        )
+        
+        # One failed page must not lose the rest of the batch
+        return [
+            result if isinstance(result, ScrapedContent) else ScrapedContent(
+                url=url,
+                title="",
+                text="",
+                success=False,
+                error=f"Scraping error: {str(result)}",
+            )
+            for url, result in zip(urls, results)
+        ]
     
     async def close(self):
         """Close the HTTP client."""
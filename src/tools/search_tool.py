@@ -4,12 +4,17 @@ Serper Search Tool
 Real-time Google search using Serper API.
 """
 
+import time
+from collections import OrderedDict
+
 import httpx
+import orjson
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
 from ..state import SearchResult
+from .http_retry import MAX_RETRIES, send_with_retries
 
 
 @dataclass
@@ -20,6 +25,9 @@ class SerperSearchConfig:
     num_results: int = 10
     country: str = "us"
     language: str = "en"
+    # Repeated searches are answered from memory for cache_ttl seconds
+    cache_ttl: float = 600.0
+    cache_max_entries: int = 256
 
 
 class SerperSearchTool:
@@ -36,11 +44,45 @@ class SerperSearchTool:
         )
         self.client: httpx.AsyncClient | None = None
         self._ensure_client()
+        
+        # Recent results of each (query, search_type, num_results) with the
+        # time they were fetched, least recently used first
+        self._query_cache: OrderedDict[
+            tuple[str, str, int], tuple[float, list[SearchResult]]
+        ] = OrderedDict()
     
     def _ensure_client(self):
         """Ensure the HTTP client is initialized and not closed."""
         if self.client is None or self.client.is_closed:
-            self.client = httpx.AsyncClient(timeout=30.0)
+            self.client = httpx.AsyncClient(
+                timeout=30.0,
+                # Connection failures are retried by the transport
+                transport=httpx.AsyncHTTPTransport(
+                    retries=MAX_RETRIES,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                ),
+            )
+    
+    def _cached_results(self, key: tuple[str, str, int]) -> Optional[list[SearchResult]]:
+        """Return a copy of the cached results for a search, if still fresh."""
+        entry = self._query_cache.get(key)
+        if entry is None:
+            return None
+        
+        fetched_at, results = entry
+        if time.monotonic() - fetched_at > self.config.cache_ttl:
+            del self._query_cache[key]
+            return None
+        
+        self._query_cache.move_to_end(key)
+        return list(results)
+    
+    def _cache_results(self, key: tuple[str, str, int], results: list[SearchResult]) -> None:
+        """Remember a search's results, evicting the least recently used when full."""
+        self._query_cache[key] = (time.monotonic(), results)
+        self._query_cache.move_to_end(key)
+        if len(self._query_cache) > self.config.cache_max_entries:
+            self._query_cache.popitem(last=False)
     
     async def search(
         self,
@@ -55,10 +97,16 @@ class SerperSearchTool:
             query: Search query string
             search_type: Type of search (search, news, images)
             num_results: Number of results to return
-            
+        
         Returns:
             List of SearchResult objects
         """
+        num_results = num_results or self.config.num_results
+        cache_key = (query, search_type, num_results)
+        cached = self._cached_results(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Ensure client is available
             self._ensure_client()
@@ -72,7 +120,7 @@ class SerperSearchTool:
                 "q": query,
                 "gl": self.config.country,
                 "hl": self.config.language,
-                "num": num_results or self.config.num_results,
+                "num": num_results,
             }
             
             # Choose endpoint based on search type
@@ -83,28 +131,29 @@ class SerperSearchTool:
             else:
                 url = self.config.base_url
             
-            response = await self.client.post(
-                url,
-                headers=headers,
-                json=payload,
+            response = await send_with_retries(
+                self.client,
+                self.client.build_request("POST", url, headers=headers, json=payload),
             )
             response.raise_for_status()
             
-            data = response.json()
-            results = []
+            data = orjson.loads(response.content)
+            
+            # All results of one search share its timestamp
+            now = datetime.now()
             
             # Parse organic results
-            organic = data.get("organic", [])
-            for item in organic:
-                result = SearchResult(
+            results = [
+                SearchResult(
                     query=query,
                     title=item.get("title", ""),
                     snippet=item.get("snippet", ""),
                     url=item.get("link", ""),
-                    timestamp=datetime.now(),
+                    timestamp=now,
                     relevance_score=item.get("position", 10) / 10,  # Invert position for score
                 )
-                results.append(result)
+                for item in data.get("organic", [])
+            ]
             
             # Also include knowledge graph if available
             kg = data.get("knowledgeGraph", {})
@@ -114,13 +163,15 @@ class SerperSearchTool:
                     title=kg.get("title", "Knowledge Graph"),
                     snippet=kg.get("description", ""),
                     url=kg.get("website", ""),
-                    timestamp=datetime.now(),
+                    timestamp=now,
                     relevance_score=1.0,  # High relevance for KG
                 )
                 results.insert(0, kg_result)
             
-            return results
-            
+            # Failed searches are not cached, so they are retried next time
+            self._cache_results(cache_key, results)
+            return list(results)
+        
         except httpx.HTTPError as e:
             # Return empty results on error, let caller handle
             return []
@@ -135,16 +186,18 @@ class SerperSearchTool:
         
         Args:
             queries: List of search queries
-            
+        
         Returns:
             Dictionary mapping queries to their results
         """
         import asyncio
         
-        tasks = [self.search(q) for q in queries]
+        # Repeated queries are only searched once
+        unique_queries = list(dict.fromkeys(queries))
+        tasks = [self.search(q) for q in unique_queries]
         results = await asyncio.gather(*tasks)
         
-        return dict(zip(queries, results))
+        return dict(zip(unique_queries, results))
     
     async def close(self):
         """Close the HTTP client."""
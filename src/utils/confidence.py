@@ -4,10 +4,19 @@ Confidence Scoring System
 Implements source validation and confidence scoring for findings.
 """
 
+from bisect import bisect_right
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
-from urllib.parse import urlparse
+
+import numpy as np
+
+from .url import extract_domain
+
+
+# Confidence labels and the lowest confidence for each label after the first
+CONFIDENCE_LABELS = ("LOW", "MEDIUM", "HIGH")
+CONFIDENCE_LABEL_BOUNDS = (0.5, 0.8)
 
 
 class SourceTier(Enum):
@@ -17,7 +26,7 @@ class SourceTier(Enum):
     TIER_3 = "tier_3"  # Social media, unverified (0.0-0.4)
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceEvaluation:
     """Evaluation of a source's reliability."""
     url: str
@@ -78,38 +87,41 @@ class ConfidenceScorer:
     }
     
     def __init__(self):
+        # Domain-level evaluations, by domain
         self._cache: dict[str, SourceEvaluation] = {}
+        
+        # Tier of each listed domain
+        self._known_tiers: dict[str, SourceTier] = {
+            **dict.fromkeys(self.TIER_3_DOMAINS, SourceTier.TIER_3),
+            **dict.fromkeys(self.TIER_2_DOMAINS, SourceTier.TIER_2),
+            **dict.fromkeys(self.TIER_1_DOMAINS, SourceTier.TIER_1),
+        }
+        
+        # Tier of every domain seen so far, seeded with the listed ones
+        self._domain_tiers: dict[str, SourceTier] = dict(self._known_tiers)
     
     def _extract_domain(self, url: str) -> str:
         """Extract base domain from URL."""
-        try:
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            # Remove www prefix
-            if domain.startswith("www."):
-                domain = domain[4:]
-            return domain
-        except:
-            return ""
+        return extract_domain(url)
     
     def _get_tier(self, domain: str) -> SourceTier:
-        """Determine source tier from domain."""
-        # Check exact match first
-        if domain in self.TIER_1_DOMAINS:
-            return SourceTier.TIER_1
-        if domain in self.TIER_2_DOMAINS:
-            return SourceTier.TIER_2
-        if domain in self.TIER_3_DOMAINS:
-            return SourceTier.TIER_3
-        
-        # Check partial matches
-        for t1_domain in self.TIER_1_DOMAINS:
-            if t1_domain in domain or domain in t1_domain:
-                return SourceTier.TIER_1
-        
-        for t2_domain in self.TIER_2_DOMAINS:
-            if t2_domain in domain or domain in t2_domain:
-                return SourceTier.TIER_2
+        """Determine source tier from domain, classifying each domain once."""
+        tier = self._domain_tiers.get(domain)
+        if tier is None:
+            tier = self._domain_tiers[domain] = self._match_tier(domain)
+        return tier
+    
+    def _match_tier(self, domain: str) -> SourceTier:
+        """Classify a domain with no exact match by its closest listed parent domain."""
+        # Walk up from the full host name, e.g. edition.cnn.com -> cnn.com
+        host = domain.partition(":")[0]  # Drop any port
+        while True:
+            tier = self._known_tiers.get(host)
+            if tier is not None:
+                return tier
+            if host.count(".") < 2:
+                break
+            host = host.split(".", 1)[1]
         
         # Default to Tier 3
         return SourceTier.TIER_3
@@ -125,22 +137,25 @@ class ConfidenceScorer:
     
     def evaluate_source(self, url: str) -> SourceEvaluation:
         """Evaluate a single source URL."""
-        if url in self._cache:
-            return self._cache[url]
-        
         domain = self._extract_domain(url)
-        tier = self._get_tier(domain)
-        confidence = self._tier_to_confidence(tier)
         
-        evaluation = SourceEvaluation(
+        # Reliability depends only on the domain, so evaluate each domain once
+        evaluation = self._cache.get(domain)
+        if evaluation is None:
+            tier = self._get_tier(domain)
+            evaluation = self._cache[domain] = SourceEvaluation(
+                url="",
+                tier=tier,
+                base_confidence=self._tier_to_confidence(tier),
+                domain=domain,
+            )
+        
+        return SourceEvaluation(
             url=url,
-            tier=tier,
-            base_confidence=confidence,
+            tier=evaluation.tier,
+            base_confidence=evaluation.base_confidence,
             domain=domain,
         )
-        
-        self._cache[url] = evaluation
-        return evaluation
     
     def calculate_confidence(
         self,
@@ -153,7 +168,7 @@ class ConfidenceScorer:
         Args:
             source_urls: List of source URLs supporting the finding
             cross_reference_bonus: Bonus for each additional confirming source
-            
+        
         Returns:
             Confidence score between 0.0 and 1.0
         """
@@ -177,15 +192,58 @@ class ConfidenceScorer:
         
         return round(confidence, 2)
     
+    def calculate_confidence_batch(
+        self,
+        source_url_lists: list[list[str]],
+        cross_reference_bonus: float = 0.1,
+    ) -> np.ndarray:
+        """
+        Calculate confidence for many findings at once.
+        
+        Equivalent to calling calculate_confidence on each list, but all
+        URLs are scored in one flattened pass and aggregated per finding
+        with NumPy.
+        
+        Args:
+            source_url_lists: Source URLs for each finding
+            cross_reference_bonus: Bonus for each additional confirming source
+        
+        Returns:
+            Array of confidence scores, one per finding
+        """
+        counts = np.fromiter((len(urls) for urls in source_url_lists), dtype=np.int64, count=len(source_url_lists))
+        confidences = np.zeros(len(source_url_lists))
+        if not counts.any():
+            return confidences
+        
+        # Flatten all URLs, remembering which finding each came from
+        evaluations = [self.evaluate_source(url) for urls in source_url_lists for url in urls]
+        owners = np.repeat(np.arange(len(source_url_lists)), counts)
+        base = np.fromiter((e.base_confidence for e in evaluations), dtype=np.float64, count=len(evaluations))
+        domain_ids: dict[str, int] = {}
+        domains = np.fromiter(
+            (domain_ids.setdefault(e.domain, len(domain_ids)) for e in evaluations),
+            dtype=np.int64,
+            count=len(evaluations),
+        )
+        
+        # Highest tier source per finding
+        has_sources = counts > 0
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[has_sources]
+        best = np.maximum.reduceat(base, starts)
+        
+        # Cross-reference bonus from distinct domains per finding
+        pairs = np.unique(owners * len(domain_ids) + domains)
+        unique_domains = np.bincount(pairs // len(domain_ids), minlength=len(source_url_lists))[has_sources]
+        bonus = np.minimum((unique_domains - 1) * cross_reference_bonus, 0.15)
+        
+        confidences[has_sources] = np.round(np.minimum(best + bonus, 1.0), 2)
+        return confidences
+    
     def requires_verification(self, confidence: float) -> bool:
         """Check if a finding needs additional verification."""
         return confidence < 0.7
     
     def get_confidence_label(self, confidence: float) -> str:
         """Get human-readable confidence label."""
-        if confidence >= 0.8:
-            return "HIGH"
-        elif confidence >= 0.5:
-            return "MEDIUM"
-        else:
-            return "LOW"
+        return CONFIDENCE_LABELS[bisect_right(CONFIDENCE_LABEL_BOUNDS, confidence)]
@@ -4,16 +4,48 @@ Audit Logger
 Comprehensive logging for tracking agent execution and decisions.
 """
 
-import json
 import logging
+import os
+import queue
+import sys
+import threading
+from collections import Counter
 from datetime import datetime
+from functools import cache, lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
-from rich.console import Console
+import orjson
+from rich.console import Console, Group, RenderableType
 from rich.logging import RichHandler
 from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
+
+
+# Console colors for low/medium/high confidence and severity
+CONFIDENCE_COLORS = ("red", "yellow", "green")
+SEVERITY_COLORS = ("white", "yellow", "red")
+
+
+def shorten(text: str, width: int) -> str:
+    """Clip text to width characters, marking clipped text with an ellipsis."""
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+@cache
+def shared_console(stderr: bool = False) -> Console:
+    """Get the process-wide Rich console for stdout or stderr, created on first use."""
+    return Console(stderr=stderr)
+
+
+@lru_cache(maxsize=64)
+def phase_panel(phase: str) -> Panel:
+    """Build the console banner for a phase, once per phase."""
+    return Panel(
+        f"[bold]Phase: {phase.replace('_', ' ').title()}[/bold]",
+        style="magenta",
+    )
 
 
 def get_logger(name: str, debug: bool = False) -> logging.Logger:
@@ -24,15 +56,25 @@ def get_logger(name: str, debug: bool = False) -> logging.Logger:
         level = logging.DEBUG if debug else logging.INFO
         logger.setLevel(level)
         
-        handler = RichHandler(
-            console=Console(stderr=True),
-            show_time=True,
-            show_path=False,
-            rich_tracebacks=True,
+        # Rich formatting only pays off on an interactive terminal
+        interactive = (
+            sys.stderr.isatty()
+            and "NO_COLOR" not in os.environ
+            and os.environ.get("TERM") != "dumb"
         )
-        handler.setLevel(level)
         
-        formatter = logging.Formatter("%(message)s")
+        if interactive:
+            handler = RichHandler(
+                console=shared_console(stderr=True),
+                show_time=True,
+                show_path=False,
+                rich_tracebacks=True,
+            )
+            formatter = logging.Formatter("%(message)s")
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+            formatter = logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        handler.setLevel(level)
         handler.setFormatter(formatter)
         
         logger.addHandler(handler)
@@ -52,6 +94,9 @@ class AuditLogger:
     - Decision points
     """
     
+    # Console lines held back before printing them in one go
+    CONSOLE_FLUSH_THRESHOLD = 32
+    
     def __init__(
         self,
         log_dir: Path,
@@ -62,35 +107,95 @@ class AuditLogger:
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
         self.target_name = target_name
-        self.console = Console() if console_output else None
+        self.console = shared_console() if console_output else None
+        self._console_buffer: list[RenderableType] = []
+        
+        # One clock read names the log file and stamps the session start
+        started = datetime.now()
         
         # Create log file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = started.strftime("%Y%m%d_%H%M%S")
         safe_name = target_name.lower().replace(" ", "_")[:30]
         self.log_file = self.log_dir / f"{safe_name}_{timestamp}.jsonl"
         
-        # Initialize entries list
-        self.entries: list[dict[str, Any]] = []
+        # Entries logged per event type; the JSONL file holds the entries
+        self.event_counts: Counter[str] = Counter()
+        
+        # Entries are serialized and appended by a background thread, so
+        # logging from the agents' event loop never waits on file I/O
+        self._pending: queue.SimpleQueue[Optional[dict[str, Any]]] = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_lines, daemon=True)
+        self._writer.start()
         
         # Session start
         self._log_entry("session_start", {
             "target": target_name,
-            "timestamp": datetime.now().isoformat(),
-        })
+            "timestamp": started,
+        }, started)
     
-    def _log_entry(self, event_type: str, data: dict[str, Any]) -> None:
-        """Write a log entry."""
+    def _log_entry(
+        self,
+        event_type: str,
+        data: dict[str, Any],
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        """Write a log entry, stamped now unless a timestamp is given."""
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp or datetime.now(),  # orjson writes it in ISO 8601
             "event_type": event_type,
             "data": data,
         }
         
-        self.entries.append(entry)
+        self.event_counts[event_type] += 1
         
-        # Write to file
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        # Serialized and written by the writer thread
+        self._pending.put(entry)
+    
+    def _write_lines(self) -> None:
+        """Append queued entries to the log file until close() is called."""
+        with open(self.log_file, "ab") as f:
+            done = False
+            while not done:
+                # Take everything queued since the last write, so a burst of
+                # entries costs one write call
+                batch = [self._pending.get()]
+                while len(batch) < 256 and not self._pending.empty():
+                    batch.append(self._pending.get())
+                if None in batch:
+                    batch = batch[:batch.index(None)]
+                    done = True
+                
+                # str() anything orjson can't encode, rather than lose the
+                # writer thread to one bad entry
+                f.write(b"".join(
+                    orjson.dumps(
+                        entry,
+                        default=str,
+                        option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS,
+                    )
+                    for entry in batch
+                ))
+                if self._pending.empty():
+                    f.flush()  # Keep the file current between bursts
+    
+    def _print(self, renderable: RenderableType) -> None:
+        """Queue a line for the console, printing once enough have built up."""
+        self._console_buffer.append(renderable)
+        if len(self._console_buffer) >= self.CONSOLE_FLUSH_THRESHOLD:
+            self.flush_console()
+    
+    def flush_console(self) -> None:
+        """Print all queued console lines in a single call."""
+        if self.console and self._console_buffer:
+            self.console.print(Group(*self._console_buffer))
+            self._console_buffer.clear()
+    
+    def close(self) -> None:
+        """Write any pending entries and stop the writer thread."""
+        self.flush_console()
+        if self._writer.is_alive():
+            self._pending.put(None)
+            self._writer.join()
     
     def log_search(
         self,
@@ -106,10 +211,11 @@ class AuditLogger:
         })
         
         if self.console:
-            self.console.print(
-                f"[blue]🔍 Search [{iteration}]:[/blue] {query} "
-                f"[dim]({num_results} results)[/dim]"
-            )
+            self._print(Text.assemble(
+                (f"🔍 Search [{iteration}]:", "blue"),
+                f" {query} ",
+                (f"({num_results} results)", "dim"),
+            ))
     
     def log_model_call(
         self,
@@ -127,10 +233,11 @@ class AuditLogger:
         })
         
         if self.console:
-            self.console.print(
-                f"[cyan]🤖 {model_type}:[/cyan] {task} "
-                f"[dim]({latency_ms:.0f}ms)[/dim]"
-            )
+            self._print(Text.assemble(
+                (f"🤖 {model_type}:", "cyan"),
+                f" {task} ",
+                (f"({latency_ms:.0f}ms)", "dim"),
+            ))
     
     def log_finding(
         self,
@@ -146,11 +253,12 @@ class AuditLogger:
         })
         
         if self.console:
-            conf_color = "green" if confidence >= 0.7 else "yellow" if confidence >= 0.4 else "red"
-            self.console.print(
-                f"[green]📋 Finding [{category}]:[/green] {fact[:80]}... "
-                f"[{conf_color}]({confidence:.0%})[/{conf_color}]"
-            )
+            conf_color = CONFIDENCE_COLORS[(confidence >= 0.4) + (confidence >= 0.7)]
+            self._print(Text.assemble(
+                (f"📋 Finding [{category}]:", "green"),
+                f" {shorten(fact, 80)} ",
+                (f"({confidence:.0%})", conf_color),
+            ))
     
     def log_risk(
         self,
@@ -166,11 +274,12 @@ class AuditLogger:
         })
         
         if self.console:
-            sev_color = "red" if severity >= 7 else "yellow" if severity >= 4 else "white"
-            self.console.print(
-                f"[{sev_color}]⚠️  Risk [{category}]:[/{sev_color}] "
-                f"{description[:60]}... [bold](Severity: {severity}/10)[/bold]"
-            )
+            sev_color = SEVERITY_COLORS[(severity >= 4) + (severity >= 7)]
+            self._print(Text.assemble(
+                (f"⚠️  Risk [{category}]:", sev_color),
+                f" {shorten(description, 60)} ",
+                (f"(Severity: {severity}/10)", "bold"),
+            ))
     
     def log_phase_change(self, old_phase: str, new_phase: str) -> None:
         """Log a workflow phase transition."""
@@ -180,12 +289,9 @@ class AuditLogger:
         })
         
         if self.console:
-            self.console.print(
-                Panel(
-                    f"[bold]Phase: {new_phase.replace('_', ' ').title()}[/bold]",
-                    style="magenta",
-                )
-            )
+            # A new phase is a natural point to show what happened so far
+            self._print(phase_panel(new_phase))
+            self.flush_console()
     
     def log_error(self, error: str, context: str = "") -> None:
         """Log an error."""
@@ -195,7 +301,8 @@ class AuditLogger:
         })
         
         if self.console:
-            self.console.print(f"[red]❌ Error:[/red] {error}")
+            self._print(Text.assemble(("❌ Error:", "red"), f" {error}"))
+            self.flush_console()
     
     def log_query_refinement(
         self,
@@ -211,25 +318,18 @@ class AuditLogger:
         })
         
         if self.console:
-            self.console.print(
-                f"[yellow]🔄 Query Refinement:[/yellow] {reason}"
-            )
+            self._print(Text.assemble(("🔄 Query Refinement:", "yellow"), f" {reason}"))
             for q in refined_queries[:3]:
-                self.console.print(f"   → {q}")
+                self._print(Text(f"   → {q}"))
     
     def get_summary(self) -> dict[str, Any]:
         """Get execution summary statistics."""
-        searches = [e for e in self.entries if e["event_type"] == "search"]
-        findings = [e for e in self.entries if e["event_type"] == "finding"]
-        risks = [e for e in self.entries if e["event_type"] == "risk"]
-        errors = [e for e in self.entries if e["event_type"] == "error"]
-        
         return {
             "target": self.target_name,
-            "total_searches": len(searches),
-            "total_findings": len(findings),
-            "total_risks": len(risks),
-            "errors": len(errors),
+            "total_searches": self.event_counts["search"],
+            "total_findings": self.event_counts["finding"],
+            "total_risks": self.event_counts["risk"],
+            "errors": self.event_counts["error"],
             "log_file": str(self.log_file),
         }
     
@@ -250,4 +350,5 @@ class AuditLogger:
         table.add_row("Errors", str(summary["errors"]))
         table.add_row("Log File", summary["log_file"])
         
+        self.flush_console()
         self.console.print(table)
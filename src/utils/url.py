@@ -0,0 +1,23 @@
+"""
+URL Helpers
+
+Shared URL parsing, memoized so a URL is parsed once however many
+components look at it.
+"""
+
+from functools import lru_cache
+from urllib.parse import urlparse
+
+
+@lru_cache(maxsize=16384)
+def extract_domain(url: str) -> str:
+    """Extract the lowercased domain of a URL, without a www prefix."""
+    try:
+        parsed = urlparse(url)
+        domain = parsed.netloc.lower()
+        # Remove www prefix
+        if domain.startswith("www."):
+            domain = domain[4:]
+        return domain
+    except:
+        return ""
@@ -10,8 +10,17 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.state import AgentState, Finding, RiskIndicator, Connection, InvestigationPhase
+from src.state import AgentState, Finding, RiskIndicator, Connection, InvestigationPhase, SearchResult
 from src.utils.confidence import ConfidenceScorer, SourceTier
+from src.models.base_model import ModelResponse, ModelType
+from src.models.groq_model import GroqModel
+from src.models.json_stream import JsonArrayStream
+from src.models.model_manager import TaskType
+from src.models.prompt_cache import ResponseCache, SemanticPromptCache
+from src.agents.connection_mapper import ConnectionMapperAgent
+from src.agents.fact_extractor import FactExtractorAgent
+from src.agents.source_validator import SourceValidatorAgent
+from src.tools.scraper_tool import WebScraperTool
 
 
 class TestAgentState:
@@ -50,6 +59,26 @@ class TestAgentState:
         assert len(state.findings) == 1
         assert state.findings[0].confidence == 0.8  # Updated to higher
     
+    def test_add_finding_merges_sources_once(self):
+        """Test that facts differing in case or spacing merge without repeating sources."""
+        state = AgentState(target_name="Test")
+        
+        state.add_finding(Finding(
+            category="biography",
+            fact="Born in 1984",
+            source_urls=["http://example.com"],
+            confidence=0.7,
+        ))
+        state.add_finding(Finding(
+            category="biography",
+            fact="born  in 1984 ",
+            source_urls=["http://example.com", "http://other.com", "http://other.com"],
+            confidence=0.8,
+        ))
+        
+        assert len(state.findings) == 1
+        assert state.findings[0].source_urls == ["http://example.com", "http://other.com"]
+    
     def test_should_continue_searching(self):
         """Test search continuation logic."""
         state = AgentState(target_name="Test", max_iterations=5)
@@ -65,6 +94,21 @@ class TestAgentState:
         state.pending_queries = []
         assert state.should_continue_searching() is False
     
+    def test_get_recent_search_results_skips_repeats(self):
+        """Test that repeated URLs and snippets are dropped from the window."""
+        state = AgentState(target_name="Test")
+        state.search_results = [
+            SearchResult("q1", "Old", "Old snippet", "http://old.com"),
+            SearchResult("q1", "A", "Snippet A", "http://a.com"),
+            SearchResult("q2", "A again", "Other snippet", "http://a.com"),
+            SearchResult("q2", "A mirror", "snippet a ", "http://mirror.com"),
+            SearchResult("q2", "B", "Snippet B", "http://b.com"),
+        ]
+        
+        recent = state.get_recent_search_results(4)
+        
+        assert [r.url for r in recent] == ["http://a.com", "http://b.com"]
+    
     def test_get_high_confidence_findings(self):
         """Test filtering high confidence findings."""
         state = AgentState(target_name="Test")
@@ -100,6 +144,14 @@ class TestConfidenceScorer:
         eval3 = scorer.evaluate_source("https://randomsite.xyz/post")
         assert eval3.tier == SourceTier.TIER_3
     
+    def test_subdomains_inherit_tier(self):
+        """Test that subdomains share their parent's tier but lookalikes don't."""
+        scorer = ConfidenceScorer()
+        
+        assert scorer.evaluate_source("https://edition.cnn.com/story").tier == SourceTier.TIER_2
+        assert scorer.evaluate_source("https://news.bbc.co.uk/story").tier == SourceTier.TIER_1
+        assert scorer.evaluate_source("https://nytimes.com.example.io/story").tier == SourceTier.TIER_3
+    
     def test_confidence_calculation_single_source(self):
         """Test confidence with single source."""
         scorer = ConfidenceScorer()
@@ -127,6 +179,20 @@ class TestConfidenceScorer:
         
         assert conf2 > conf1
     
+    def test_confidence_batch_matches_single(self):
+        """Test batched confidence matches per-finding calculation."""
+        scorer = ConfidenceScorer()
+        url_lists = [
+            ["https://nytimes.com/article", "https://wsj.com/story"],
+            [],
+            ["https://random.blog/post", "https://www.random.blog/other"],
+            ["https://techcrunch.com/a", "https://sec.gov/b", "https://x.com/c"],
+        ]
+        
+        batch = scorer.calculate_confidence_batch(url_lists).tolist()
+        
+        assert batch == [scorer.calculate_confidence(urls) for urls in url_lists]
+    
     def test_confidence_label(self):
         """Test confidence label generation."""
         scorer = ConfidenceScorer()
@@ -199,6 +265,229 @@ class TestConnectionModel:
         assert data["timeframe"] == "2010-2020"
 
 
+class TestSemanticPromptCache:
+    """Tests for SemanticPromptCache class."""
+    
+    def test_similar_prompt_hit(self):
+        """Test that a near-identical prompt reuses the cached response."""
+        cache = SemanticPromptCache(threshold=0.9)
+        response = ModelResponse(content="[]", model_type=ModelType.GROQ, model_name="test")
+        prompt = " ".join(f"token{i}" for i in range(100))
+        
+        cache.put("facts", prompt, response)
+        
+        assert cache.get("facts", prompt) is response
+        assert cache.get("facts", prompt + " extra") is response
+    
+    def test_dissimilar_prompt_and_namespace_miss(self):
+        """Test that unrelated prompts and other namespaces miss."""
+        cache = SemanticPromptCache()
+        response = ModelResponse(content="[]", model_type=ModelType.GROQ, model_name="test")
+        
+        cache.put("facts", "Elizabeth Holmes founded Theranos", response)
+        
+        assert cache.get("facts", "Adam Neumann founded WeWork in New York") is None
+        assert cache.get("connections", "Elizabeth Holmes founded Theranos") is None
+    
+    def test_persists_newest_entries(self, tmp_path):
+        """Test that the newest entries per namespace are reloaded from SQLite."""
+        path = tmp_path / "prompts.sqlite3"
+        
+        cache = SemanticPromptCache(max_entries=2, path=path)
+        for i in range(3):
+            cache.put("facts", f"Prompt number {i} about Theranos", ModelResponse(
+                content=f"[{i}]", model_type=ModelType.GROQ, model_name="test",
+            ))
+        cache.close()
+        
+        reloaded = SemanticPromptCache(threshold=0.99, max_entries=2, path=path)
+        assert reloaded.get("facts", "Prompt number 2 about Theranos").content == "[2]"
+        assert reloaded.get("facts", "Prompt number 0 about Theranos") is None
+
+
+class TestResponseCache:
+    """Tests for ResponseCache class."""
+    
+    def test_persists_across_instances(self, tmp_path):
+        """Test that cached responses are reloaded from SQLite."""
+        path = tmp_path / "responses.sqlite3"
+        key = ResponseCache.make_key("prompt", {"type": "array"}, TaskType.FAST_EXTRACTION)
+        
+        cache = ResponseCache(path)
+        assert cache.get(key) is None
+        cache.put(key, ModelResponse(content="[1]", model_type=ModelType.GROQ, model_name="test"))
+        cache.close()
+        
+        cached = ResponseCache(path).get(key)
+        assert cached.content == "[1]"
+        assert cached.model_type == ModelType.GROQ
+    
+    def test_stored_entries_are_capped(self, tmp_path):
+        """Test that only the newest stored entries are kept across instances."""
+        path = tmp_path / "responses.sqlite3"
+        keys = [ResponseCache.make_key(f"prompt {i}", {"type": "array"}, TaskType.FAST_EXTRACTION) for i in range(3)]
+        
+        cache = ResponseCache(path, max_stored_entries=2)
+        for key in keys:
+            cache.put(key, ModelResponse(content="[1]", model_type=ModelType.GROQ, model_name="test"))
+        cache.close()
+        
+        reopened = ResponseCache(path, max_stored_entries=2)
+        assert reopened.get(keys[0]) is None
+        assert reopened.get(keys[2]) is not None
+        assert ResponseCache(path, ttl=0).get(keys[2]) is None
+    
+    def test_key_depends_on_schema_and_task(self):
+        """Test that schema and task type are part of the key."""
+        key = ResponseCache.make_key("prompt", {"type": "array"}, TaskType.FAST_EXTRACTION)
+        
+        assert key != ResponseCache.make_key("prompt", {"type": "object"}, TaskType.FAST_EXTRACTION)
+        assert key != ResponseCache.make_key("prompt", {"type": "array"}, TaskType.COMPLEX_REASONING)
+
+
+class TestGroqModel:
+    """Tests for GroqModel class."""
+    
+    def test_array_without_items_key_is_an_error(self):
+        """Test that a JSON-mode object without an "items" array isn't read as an empty list."""
+        model = GroqModel(api_key="test", model_name="test")
+        model.generate = AsyncMock(return_value=ModelResponse(
+            content='{"findings": [{"fact": "Born 1984"}]}',
+            model_type=ModelType.GROQ,
+            model_name="test",
+        ))
+        
+        response = asyncio.run(model.generate_structured("prompt", {"type": "array"}))
+        
+        assert not response.success
+    
+    def test_array_items_are_unwrapped(self):
+        """Test that array schemas are unwrapped from the "items" object."""
+        model = GroqModel(api_key="test", model_name="test")
+        model.generate = AsyncMock(return_value=ModelResponse(
+            content='{"items": [{"fact": "Born 1984"}]}',
+            model_type=ModelType.GROQ,
+            model_name="test",
+        ))
+        
+        response = asyncio.run(model.generate_structured("prompt", {"type": "array"}))
+        
+        assert response.json() == [{"fact": "Born 1984"}]
+
+
+class TestJsonArrayStream:
+    """Tests for JsonArrayStream class."""
+    
+    def test_items_parsed_as_chunks_arrive(self):
+        """Test that each item is returned once its closing brace arrives."""
+        parser = JsonArrayStream()
+        
+        assert parser.feed('```json\n[{"name": "A ]}"}, {"na') == [{"name": "A ]}"}]
+        assert parser.feed('me": "B"}]\n```') == [{"name": "B"}]
+        parser.close()
+    
+    def test_incomplete_array_raises(self):
+        """Test that a truncated response is reported on close."""
+        parser = JsonArrayStream()
+        parser.feed('[{"name": "A"}, {"name"')
+        
+        with pytest.raises(ValueError):
+            parser.close()
+
+
+class TestConnectionMapperAgent:
+    """Tests for ConnectionMapperAgent class."""
+    
+    def test_mapping_reused_only_for_identical_prompts(self):
+        """Test that states with the same counts but different results are mapped separately."""
+        calls = []
+        
+        async def stream_structured(prompt, *args, **kwargs):
+            calls.append(prompt)
+            yield {"entity_name": "Acme Corp", "entity_type": "organization", "relationship": "founded"}
+        
+        model_manager = MagicMock()
+        model_manager.stream_structured = stream_structured
+        mapper = ConnectionMapperAgent(model_manager)
+        
+        def state_with(snippet: str) -> AgentState:
+            state = AgentState(target_name="John Doe")
+            state.search_results = [
+                SearchResult(query="q", title="First", snippet=snippet, url="https://a.com"),
+                SearchResult(query="q", title="Last", snippet="Same tail", url="https://b.com"),
+            ]
+            return state
+        
+        asyncio.run(mapper.map_connections(state_with("Founded Acme")))
+        asyncio.run(mapper.map_connections(state_with("Founded Acme")))
+        connections = asyncio.run(mapper.map_connections(state_with("Joined Initech")))
+        
+        assert len(calls) == 2
+        assert [c.entity_name for c in connections] == ["Acme Corp"]
+
+
+class TestFactExtractorAgent:
+    """Tests for FactExtractorAgent class."""
+    
+    def test_prepare_content_keeps_short_factual_lines(self):
+        """Test that short lines with numbers or names survive, but menu items don't."""
+        content = "Home\nAbout\nBorn: 1984\nCEO, Theranos\nShe founded the company in 2003."
+        
+        text = FactExtractorAgent(MagicMock())._prepare_content(content)
+        
+        assert text.splitlines() == ["Born: 1984", "CEO, Theranos", "She founded the company in 2003."]
+
+
+class TestSourceValidatorAgent:
+    """Tests for SourceValidatorAgent class."""
+    
+    def test_batch_results_matched_by_id(self):
+        """Test that batched results update the finding with the matching number."""
+        model_manager = MagicMock()
+        model_manager.generate_structured = AsyncMock(return_value=ModelResponse(
+            content='{"results": ['
+                    '{"id": 2, "supported": true, "contradicted": false, "revised_confidence": 0.9},'
+                    '{"id": 7, "supported": true, "contradicted": false, "revised_confidence": 0.9}]}',
+            model_type=ModelType.GROQ,
+            model_name="test",
+        ))
+        state = AgentState(target_name="John Doe")
+        state.findings = [
+            Finding(category="biography", fact=f"Fact {i}", source_urls=[], confidence=0.4)
+            for i in range(3)
+        ]
+        
+        validated = asyncio.run(SourceValidatorAgent(model_manager).validate_all(state))
+        
+        assert model_manager.generate_structured.await_count == 1
+        assert [f.verified for f in validated] == [False, True, False]
+        assert validated[1].confidence == 0.9
+    
+    def test_validation_queries_use_leading_words(self):
+        """Test that queries quote the first words of a finding, not a list."""
+        state = AgentState(target_name="John Doe")
+        state.findings = [
+            Finding(category="biography", fact="Born in Ohio in 1970", source_urls=[], confidence=0.4),
+        ]
+        
+        queries = SourceValidatorAgent(MagicMock()).generate_validation_queries(state)
+        
+        assert queries == ["John Doe biography Born in Ohio"]
+
+
+class TestWebScraperTool:
+    """Tests for WebScraperTool class."""
+    
+    def test_blocked_domains_match_by_suffix(self):
+        """Test that blocked domains cover subdomains but not lookalike names."""
+        scraper = WebScraperTool()
+        
+        assert scraper._is_blocked_domain("https://www.facebook.com/profile")
+        assert scraper._is_blocked_domain("https://x.com/user")
+        assert not scraper._is_blocked_domain("https://netx.com/article")
+        assert not scraper._is_blocked_domain("https://example.com/page")
+
+
 # Integration tests require API keys, so they're marked to skip by default
 @pytest.mark.skip(reason="Requires API keys")
 class TestIntegration: